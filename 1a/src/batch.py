@@ -0,0 +1,224 @@
+import os
+import math
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # The smallest value with at least pct% of the values at or below it; pct * n is
+    # exact for whole percentages, so whole ranks are not pushed up by rounding
+    rank = max(1, math.ceil(pct * len(ordered) / 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(records, elapsed):
+    """Build the end-of-run summary from per-file records"""
+    latencies = [r["elapsed"] for r in records if r["status"] == "ok"]
+    summary = {
+        "files": len(records),
+        "ok": sum(1 for r in records if r["status"] == "ok"),
+        "failed": sum(1 for r in records if r["status"] == "failed"),
+        "timeout": sum(1 for r in records if r["status"] == "timeout"),
+        "skipped": sum(1 for r in records if r["status"] == "skipped"),
+        "elapsed": elapsed,
+        "files_per_sec": len(records) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "cache_hits": sum(1 for r in records if r.get("cache") == "hit"),
+        "cache_misses": sum(1 for r in records if r.get("cache") == "miss"),
+        "stages": {},
+        "rule_hits": {},
+    }
+    # Total time spent in each extractor stage across all documents
+    for record in records:
+        for stage, seconds in ((record.get("timings") or {}).get("stages") or {}).items():
+            summary["stages"][stage] = summary["stages"].get(stage, 0.0) + seconds
+    # Documents ruled out by triage, by reason code
+    summary["skip_reasons"] = {}
+    for record in records:
+        if record["status"] == "skipped":
+            summary["skip_reasons"][record["reason"]] = summary["skip_reasons"].get(record["reason"], 0) + 1
+    # Aggregate the per-file heading rule hit counters
+    for record in records:
+        for rule, count in (record.get("rules") or {}).items():
+            summary["rule_hits"][rule] = summary["rule_hits"].get(rule, 0) + count
+    return summary
+
+
+def print_summary(summary):
+    """Print the end-of-run summary"""
+    print(f"Processed {summary['files']} files "
+          f"({summary['ok']} ok, {summary['skipped']} skipped, {summary['failed']} failed, "
+          f"{summary['timeout']} timed out) "
+          f"in {summary['elapsed']:.2f} seconds")
+    print(f"Throughput: {summary['files_per_sec']:.2f} files/sec, "
+          f"latency p50 {summary['p50']:.3f}s, p95 {summary['p95']:.3f}s")
+    if summary["skip_reasons"]:
+        print("Skipped: " + ", ".join(f"{reason}={count}" for reason, count in sorted(summary["skip_reasons"].items())))
+    if summary["cache_hits"] or summary["cache_misses"]:
+        print(f"Cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses")
+    if summary["stages"]:
+        print("Stage totals: " + ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in summary["stages"].items()))
+    if summary["rule_hits"]:
+        hits = sorted(summary["rule_hits"].items(), key=lambda item: (-item[1], item[0]))
+        print("Rule hits: " + ", ".join(f"{rule}={count}" for rule, count in hits))
+
+
+def _worker_loop(extractor, conn):
+    """Worker process: receive filenames, process them, send back records"""
+    while True:
+        try:
+            filename = conn.recv()
+        except EOFError:
+            break
+        if filename is None:
+            break
+        conn.send(extractor.process_file(filename))
+    conn.close()
+
+
+class BatchProcessor:
+    """Process-pool batch engine with per-file timeouts and crash isolation.
+
+    Every worker is fed one file at a time over its own pipe, so the parent
+    always knows which file a worker is on. A worker that exceeds the timeout
+    is terminated and a worker that dies is replaced; in both cases only the
+    file it was holding is marked as failed and the rest of the run goes on.
+
+    run() processes a fixed list of files. Long-running callers can instead
+    start() the pool once, submit() files as they arrive and poll() for
+    finished records, keeping the workers warm between files.
+    """
+
+    def __init__(self, extractor, workers=None, timeout=None):
+        self.extractor = extractor
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.ctx = multiprocessing.get_context()
+        self.pool = []
+        self.queue = deque()
+
+    def _spawn(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        proc = self.ctx.Process(target=_worker_loop, args=(self.extractor, child_conn), daemon=True)
+        proc.start()
+        child_conn.close()
+        return {"proc": proc, "conn": parent_conn, "task": None, "started": None}
+
+    def _stop(self, worker, kill=False):
+        if kill:
+            worker["proc"].terminate()
+        else:
+            try:
+                worker["conn"].send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        worker["proc"].join(1)
+        if worker["proc"].is_alive():
+            worker["proc"].kill()
+            worker["proc"].join()
+        worker["conn"].close()
+
+    def _dispatch(self, worker):
+        if self.queue:
+            key, filename = self.queue.popleft()
+            worker["task"] = (key, filename)
+            worker["started"] = time.time()
+            worker["conn"].send(filename)
+        else:
+            worker["task"] = None
+
+    def _fail(self, worker, status, error):
+        key, filename = worker["task"]
+        print(f"Error processing {filename}: {error}")
+        return key, {
+            "file": filename,
+            "status": status,
+            "elapsed": time.time() - worker["started"],
+            "error": error,
+        }
+
+    @property
+    def outstanding(self):
+        """Number of submitted files that have not produced a record yet"""
+        return len(self.queue) + sum(1 for w in self.pool if w["task"])
+
+    def start(self, size=None):
+        """Start the worker processes"""
+        self.pool = [self._spawn() for _ in range(size if size is not None else self.workers)]
+
+    def submit(self, filename, key=None):
+        """Queue a file; its record is returned by poll() together with key"""
+        self.queue.append((filename if key is None else key, filename))
+        for worker in self.pool:
+            if not worker["task"]:
+                self._dispatch(worker)
+                break
+
+    def poll(self, timeout=None):
+        """Wait up to timeout seconds for work to finish; returns a list of (key, record)"""
+        done = []
+        busy = [w for w in self.pool if w["task"]]
+        if not busy:
+            if timeout:
+                time.sleep(timeout)
+            return done
+
+        wait_for = timeout
+        if self.timeout:
+            deadline = min(w["started"] for w in busy) + self.timeout
+            wait_for = max(0.0, deadline - time.time()) if timeout is None else \
+                max(0.0, min(timeout, deadline - time.time()))
+        ready = wait([w["conn"] for w in busy] + [w["proc"].sentinel for w in busy], wait_for)
+
+        for i, worker in enumerate(self.pool):
+            if not worker["task"]:
+                continue
+            if worker["conn"] in ready:
+                try:
+                    record = worker["conn"].recv()
+                except (EOFError, OSError):
+                    record = None
+                if record is not None:
+                    done.append((worker["task"][0], record))
+                    self._dispatch(worker)
+                    continue
+            if worker["proc"].sentinel in ready or worker["conn"] in ready:
+                worker["proc"].join(1)
+                done.append(self._fail(worker, "failed", f"worker exited with code {worker['proc'].exitcode}"))
+            elif self.timeout and time.time() - worker["started"] >= self.timeout:
+                done.append(self._fail(worker, "timeout", f"timed out after {self.timeout} seconds"))
+            else:
+                continue
+            # Replace the crashed or stuck worker and move on
+            self._stop(worker, kill=True)
+            self.pool[i] = self._spawn()
+            self._dispatch(self.pool[i])
+        return done
+
+    def close(self):
+        """Stop every worker; queued files that were not started are dropped"""
+        self.queue.clear()
+        for worker in self.pool:
+            self._stop(worker)
+        self.pool = []
+
+    def run(self, filenames):
+        """Process filenames and return their records in input order"""
+        records = [None] * len(filenames)
+        self.start(min(self.workers, len(filenames)))
+        try:
+            for index, filename in enumerate(filenames):
+                self.submit(filename, index)
+            while self.outstanding:
+                for index, record in self.poll():
+                    records[index] = record
+        finally:
+            self.close()
+        return records
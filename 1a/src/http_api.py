@@ -0,0 +1,245 @@
+import json
+import asyncio
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Extractor owned by each pool worker, created once by the pool initializer
+_extractor = None
+
+
+def _init_worker(extractor):
+    global _extractor
+    _extractor = extractor
+
+
+def _extract(data, filename):
+    # Fresh per-request state, so timings do not pile up over the server's lifetime
+    _extractor.start_document()
+    return _extractor.extract_headings(filename, data)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 422: "Unprocessable Entity",
+           500: "Internal Server Error", 504: "Gateway Timeout"}
+
+
+def parse_multipart(body, content_type):
+    """Split a multipart/form-data body into (filename, bytes) parts"""
+    boundary = None
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary':
+            boundary = value.strip('"')
+    if not boundary:
+        raise HTTPError(400, "multipart body without boundary")
+
+    parts = []
+    delimiter = b'--' + boundary.encode('latin-1')
+    for index, chunk in enumerate(body.split(delimiter)):
+        if not chunk or chunk.startswith(b'--'):
+            continue
+        head, separator, content = chunk.partition(b'\r\n\r\n')
+        if not separator:
+            continue
+        filename = f"upload{index}.pdf"
+        for line in head.decode('latin-1').split('\r\n'):
+            if line.lower().startswith('content-disposition:'):
+                for param in line.split(';')[1:]:
+                    key, _, value = param.strip().partition('=')
+                    if key.lower() == 'filename' and value.strip('"'):
+                        filename = value.strip('"')
+        # The part ends with the CRLF that precedes the next delimiter
+        if content.endswith(b'\r\n'):
+            content = content[:-2]
+        parts.append((filename, content))
+    return parts
+
+
+class ExtractionServer:
+    """Asyncio HTTP front end for PDFOutlineExtractor with a shared process pool.
+
+    Endpoints:
+        POST /extract  PDF as the raw request body (streamed via Content-Length or
+                       chunked encoding) or as a single multipart/form-data file;
+                       returns {"title", "outline"}. ?filename= sets the name used
+                       for title fallbacks.
+        POST /batch    multipart/form-data with any number of PDFs; returns
+                       {"results": [{"filename", "title", "outline"} | {"filename", "error"}]}
+        GET  /health   liveness check
+
+    PDFs are parsed from memory in the pool workers; nothing is written to disk.
+    At most max_concurrency extractions run at once and each one is bounded by
+    request_timeout seconds. A worker cannot be interrupted mid-document, so a
+    timed-out extraction keeps its worker busy until it finishes.
+    """
+
+    def __init__(self, extractor, host='0.0.0.0', port=8080, workers=None, max_concurrency=None,
+                 request_timeout=30.0, max_body=50 * 1024 * 1024):
+        self.extractor = extractor
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_concurrency = max_concurrency or (workers or 1) * 2
+        self.request_timeout = request_timeout
+        self.max_body = max_body
+        self.pool = None
+        self.slots = None
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.extractor,))
+
+    async def extract(self, data, filename):
+        """Run one extraction in the pool, bounded by the concurrency limit and timeout"""
+        loop = asyncio.get_running_loop()
+        async with self.slots:
+            pool = self.pool
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(pool, _extract, data, filename), self.request_timeout)
+            except asyncio.TimeoutError:
+                raise HTTPError(504, f"extraction timed out after {self.request_timeout} seconds")
+            except BrokenProcessPool:
+                # A worker died (e.g. on a malformed PDF); replace the pool for later requests,
+                # unless another request on the same broken pool already did
+                if self.pool is pool:
+                    pool.shutdown(wait=False)
+                    self.pool = self._new_pool()
+                raise HTTPError(500, "extraction worker crashed")
+        if result.get("reason") == "encrypted":
+            raise HTTPError(422, "PDF is encrypted")
+        if result["title"] == "Error" and not result["outline"]:
+            raise HTTPError(422, "could not parse PDF")
+        return result
+
+    async def read_body(self, reader, headers):
+        """Read the request body, honouring Content-Length or chunked transfer encoding"""
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            body = bytearray()
+            while True:
+                size_line = await reader.readline()
+                try:
+                    size = int(size_line.split(b';')[0].strip() or b'0', 16)
+                except ValueError:
+                    size = -1
+                if size < 0:
+                    raise HTTPError(400, "invalid chunk size")
+                if size == 0:
+                    # Skip trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return bytes(body)
+                if len(body) + size > self.max_body:
+                    raise HTTPError(413, "request body too large")
+                body += await reader.readexactly(size)
+                await reader.readline()
+        if 'content-length' not in headers:
+            raise HTTPError(411, "Content-Length or chunked encoding required")
+        length = headers['content-length']
+        if not (length.isascii() and length.isdigit()):
+            raise HTTPError(400, "invalid Content-Length")
+        length = int(length)
+        if length > self.max_body:
+            raise HTTPError(413, "request body too large")
+        return await reader.readexactly(length)
+
+    async def route(self, method, target, headers, reader):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == '/health':
+            return 200, {"status": "ok"}
+        if url.path not in ('/extract', '/batch'):
+            raise HTTPError(404, "not found")
+        if method != 'POST':
+            raise HTTPError(405, "use POST")
+
+        body = await self.read_body(reader, headers)
+        content_type = headers.get('content-type', '')
+        if content_type.lower().startswith('multipart/form-data'):
+            files = parse_multipart(body, content_type)
+        else:
+            files = [(query.get('filename', ['upload.pdf'])[0], body)]
+        if not files:
+            raise HTTPError(400, "no PDF in request")
+
+        if url.path == '/extract':
+            filename, data = files[0]
+            return 200, await self.extract(data, filename)
+
+        async def one(filename, data):
+            try:
+                result = await self.extract(data, filename)
+                return {"filename": filename, **result}
+            except HTTPError as e:
+                return {"filename": filename, "error": e.message}
+        return 200, {"results": await asyncio.gather(*(one(f, d) for f, d in files))}
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    status, payload = await self.route(method, target, headers, reader)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    print(f"Error handling {method} {target}: {str(e)}")
+                    status, payload = 500, {"error": str(e)}
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                # A body the handler did not consume cannot be skipped reliably
+                if status in (400, 404, 405, 411, 413) and method == 'POST':
+                    keep_alive = False
+                body = json.dumps(payload).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.pool = self._new_pool()
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print(f"Serving outline extraction on http://{self.host}:{self.port} "
+              f"(max {self.max_concurrency} concurrent extractions)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(wait=False)
+
+    def serve_forever(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Per-document wall-clock timings, accumulated by stage name.
+
+    Stages used by the extractor: cache, parse, triage, title, outline,
+    extract_text, classify and write. Per-page extract_text times are kept separately.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.page_times = []
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_page(self, seconds):
+        """Record the text extraction time of one page"""
+        self.page_times.append(seconds)
+        self.add("extract_text", seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def as_dict(self):
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "pages": len(self.page_times),
+            "page_times": [round(seconds, 6) for seconds in self.page_times],
+        }
+
+
+class DocumentProfiler:
+    """Run one document under cProfile and tracemalloc and dump both to profile_dir"""
+
+    def __init__(self, profile_dir, name, top=25):
+        self.profile_dir = profile_dir
+        self.name = name
+        self.top = top
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        tracemalloc.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, self.name)
+        self.profile.dump_stats(base + '.prof')
+        with open(base + '.mem.txt', 'w', encoding='utf-8') as f:
+            f.write(f"peak traced memory: {peak} bytes\n")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                f.write(f"{stat}\n")
+        return False
+
+
+def keep_slowest_profiles(profile_dir, records, count):
+    """Delete the dumped profiles of every document except the count slowest"""
+    ranked = sorted((r for r in records if r), key=lambda r: r["elapsed"], reverse=True)
+    for record in ranked[count:]:
+        base = os.path.join(profile_dir, record["file"])
+        for suffix in ('.prof', '.mem.txt'):
+            if os.path.exists(base + suffix):
+                os.remove(base + suffix)
+    return [r["file"] for r in ranked[:count]]
+
+
+def write_metrics(path, summary, records):
+    """Write the run summary and every per-document record as a metrics JSON file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"summary": summary, "documents": records}, f, indent=2)
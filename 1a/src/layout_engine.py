@@ -0,0 +1,194 @@
+import math
+import time
+from collections import Counter
+from outline import Outline
+
+# Font name fragments that mark a bold face (e.g. "Helvetica-Bold", "Arial,Black")
+BOLD_MARKERS = ('bold', 'black', 'heavy', 'semibold', 'demi')
+
+# Font sizes are bucketed to half points when building the histogram
+SIZE_STEP = 0.5
+
+# Vertical movement (in points) that starts a new line
+LINE_TOLERANCE = 1.0
+
+LEVELS = ("H1", "H2", "H3")
+
+# The cover title must start within this many lines of the top of page 0
+TITLE_LINES = 3
+
+
+class TextLine:
+    """A visual line of text with the dominant font size and weight of its runs"""
+    __slots__ = ('text', 'size', 'bold', 'page')
+
+    def __init__(self, page):
+        self.text = ""
+        self.size = 0.0
+        self.bold = False
+        self.page = page
+
+
+def _scale(matrix):
+    """Vertical scale factor of a PDF transformation matrix"""
+    return math.hypot(matrix[2], matrix[3]) or 1.0
+
+
+def _is_bold(font_dict):
+    if not font_dict:
+        return False
+    name = str(font_dict.get('/BaseFont', '')).lower()
+    return any(marker in name for marker in BOLD_MARKERS)
+
+
+class LayoutEngine:
+    """Heading extraction from font size and weight instead of plain text.
+
+    Each page is decoded once through PyPDF2's visitor_text callback, which
+    reports every text run together with its font, size and text matrix.
+    Runs are joined into visual lines, a per-document histogram of font
+    sizes (weighted by character count) identifies the body text size, and
+    the distinct sizes above it are ranked to H1/H2/H3. Bold lines at body
+    size rank just below the larger sizes. A cover title on page 0, set larger
+    than anything else in the document, is left out of the ranking, so its
+    size does not take the H1 rank.
+    """
+
+    def __init__(self, max_length=100, max_words=15):
+        self.max_length = max_length
+        self.max_words = max_words
+
+    def page_lines(self, page, page_num):
+        """Decode one page into TextLines in a single visitor pass"""
+        lines = []
+        state = {"line": TextLine(page_num), "y": None}
+
+        def new_line():
+            if state["line"].text.strip():
+                lines.append(state["line"])
+            state["line"] = TextLine(page_num)
+
+        def visitor(text, cm, tm, font_dict, font_size):
+            if not text:
+                return
+            y = tm[5] * _scale(cm) + cm[5]
+            if state["y"] is not None and abs(y - state["y"]) > LINE_TOLERANCE:
+                new_line()
+            state["y"] = y
+            size = round(font_size * _scale(tm) * _scale(cm) / SIZE_STEP) * SIZE_STEP
+            bold = _is_bold(font_dict)
+            for index, part in enumerate(text.split('\n')):
+                if index:
+                    new_line()
+                if not part.strip():
+                    continue
+                line = state["line"]
+                line.text += part
+                if size > line.size:
+                    line.size = size
+                line.bold = line.bold or bold
+
+        page.extract_text(visitor_text=visitor)
+        new_line()
+        return lines
+
+    @staticmethod
+    def title_run(lines):
+        """Slice of page 0 lines holding the cover title: the first lines set in the page's largest size"""
+        if not lines:
+            return slice(0)
+        size = max(line.size for line in lines)
+        start = next((i for i, line in enumerate(lines[:TITLE_LINES]) if line.size == size), None)
+        if start is None:
+            return slice(0)
+        end = start + 1
+        while end < len(lines) and lines[end].size == size:
+            end += 1
+        return slice(start, end)
+
+    def assign_levels(self, histogram, bold_at_size):
+        """Build a TextLine -> heading level (or None) mapping from the font-size histogram"""
+        if not histogram:
+            return lambda line: None
+
+        # The most common size (by characters) is the body text
+        body_size = histogram.most_common(1)[0][0]
+        heading_sizes = sorted((size for size in histogram if size > body_size), reverse=True)
+        rank = {size: LEVELS[min(i, len(LEVELS) - 1)] for i, size in enumerate(heading_sizes)}
+        # Bold body text only marks headings when the body itself is not set in bold
+        bold_body_level = LEVELS[min(len(heading_sizes), len(LEVELS) - 1)] \
+            if bold_at_size[body_size] * 2 < histogram[body_size] else None
+
+        def level(line):
+            if line.size in rank:
+                return rank[line.size]
+            if line.bold and line.size == body_size:
+                return bold_body_level
+            return None
+        return level
+
+    def extract(self, pdf_reader, title=None, pages=None, timer=None):
+        """Extract headings from (page_num, page) pairs (by default every page) as an Outline.
+
+        With a StageTimer, each page's decode is recorded as its extract_text time and
+        level assignment as classify.
+        """
+        if pages is None:
+            pages = enumerate(pdf_reader.pages)
+
+        seen_text = set()  # To avoid duplicate headings
+        if title:
+            seen_text.add(title.strip())
+
+        # Every line feeds the size histogram, but only lines short enough to be
+        # headings are kept, so body text is not held in memory
+        histogram = Counter()
+        bold_at_size = Counter()
+        candidates = []
+        title_lines = []
+        for page_num, page in pages:
+            start = time.perf_counter()
+            page_lines = self.page_lines(page, page_num)
+            if timer:
+                timer.add_page(time.perf_counter() - start)
+            if page_num == 0:
+                title_lines = page_lines[self.title_run(page_lines)]
+            for line in page_lines:
+                text = ' '.join(line.text.split())
+                if page_num == 0 and any(line is title_line for title_line in title_lines):
+                    # Kept out of the histogram until the whole document has been seen
+                    line.text = text
+                else:
+                    histogram[line.size] += len(text)
+                    if line.bold:
+                        bold_at_size[line.size] += len(text)
+                # Skip page numbers, running text and other non-heading runs
+                if len(text) < 2 or len(text) > self.max_length or len(text.split()) > self.max_words:
+                    continue
+                if text.replace('.', '').isdigit():
+                    continue
+                line.text = text
+                candidates.append(line)
+
+        start = time.perf_counter()
+        # The cover lines are the title if nothing else is set as large; the title is then
+        # neither a heading nor a heading size, and its raw lines are deduplicated too,
+        # since the reported title may differ (e.g. "X Resume")
+        if title_lines and all(size < title_lines[0].size for size in histogram):
+            seen_text.update(line.text for line in title_lines)
+        else:
+            for line in title_lines:
+                histogram[line.size] += len(line.text)
+                if line.bold:
+                    bold_at_size[line.size] += len(line.text)
+        headings = Outline(title)
+        levels = self.assign_levels(histogram, bold_at_size)
+        for line in candidates:
+            level = levels(line)
+            if level is None or line.text in seen_text:
+                continue
+            seen_text.add(line.text)
+            headings.append(level, line.text, line.page)
+        if timer:
+            timer.add("classify", time.perf_counter() - start)
+        return headings
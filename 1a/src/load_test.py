@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Load test for the HTTP extraction API.
+
+Sends synthetic PDFs (or a given PDF) to a running server with a fixed number
+of concurrent keep-alive connections and reports throughput and latency:
+
+    python main.py --serve --port 8080 &
+    python load_test.py --url http://127.0.0.1:8080/extract --requests 500 --concurrency 16
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import os
+from urllib.parse import urlsplit
+from batch import percentile
+from synthetic_pdf import generate_document, write_pdf
+
+
+async def post(reader, writer, host, path, body):
+    """Send one POST on an open connection and return (status, response body)"""
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/pdf\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(url, body, queue, latencies, errors):
+    """One keep-alive connection issuing requests until the queue is empty"""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    connection = None
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            status, _ = await post(*connection, parts.netloc, path, body)
+            if status != 200:
+                errors.append(status)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            errors.append(type(e).__name__)
+            connection = None
+            continue
+        latencies.append(time.perf_counter() - start)
+    if connection:
+        connection[1].close()
+
+
+async def run(args, body):
+    queue = asyncio.Queue()
+    for index in range(args.requests):
+        queue.put_nowait(index)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.url, body, queue, latencies, errors) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "pdf_bytes": len(body),
+        "ok": len(latencies) - sum(1 for e in errors if isinstance(e, int)),
+        "errors": len(errors),
+        "elapsed": elapsed,
+        "requests_per_sec": args.requests / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the PDF outline extraction API")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/extract")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pdf", help="PDF to send (default: a generated synthetic report)")
+    parser.add_argument("--pages", type=int, default=10, help="Pages of the generated PDF")
+    args = parser.parse_args()
+
+    if args.pdf:
+        with open(args.pdf, 'rb') as f:
+            body = f.read()
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "load.pdf")
+            write_pdf(generate_document("report", args.pages, 0.15), path)
+            with open(path, 'rb') as f:
+                body = f.read()
+
+    results = asyncio.run(run(args, body))
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,129 @@
 import os
 import json
 import time
-from pdf_processor import PDFOutlineExtractor
+import argparse
+from pdf_processor import PDFOutlineExtractor, ENGINES
+from outline import FORMATS
+from watcher import FolderWatcher
+from http_api import ExtractionServer
+from shard import ShardRunner
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract structured outlines from PDF documents")
+    parser.add_argument("--input-dir", default=os.environ.get("PDF_INPUT_DIR", "/app/input"))
+    parser.add_argument("--output-dir", default=os.environ.get("PDF_OUTPUT_DIR", "/app/output"))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1)),
+                        help="Number of worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=float(os.environ.get("PDF_TIMEOUT", 0)) or None,
+                        help="Per-file timeout in seconds (default: none)")
+    parser.add_argument("--cache-dir", default=os.environ.get("PDF_CACHE_DIR") or None,
+                        help="Directory for the persistent result cache (default: disabled)")
+    parser.add_argument("--cache-size-mb", type=int, default=int(os.environ.get("PDF_CACHE_SIZE_MB", 256)),
+                        help="Maximum size of cached results in MB")
+    parser.add_argument("--incremental", action="store_true", default=os.environ.get("PDF_INCREMENTAL") == "1",
+                        help="Keep page texts in the cache and only re-extract changed pages of re-submitted files")
+    parser.add_argument("--no-outline", action="store_true", default=os.environ.get("PDF_USE_OUTLINE") == "0",
+                        help="Ignore embedded PDF bookmarks and always mine the page text")
+    parser.add_argument("--engine", choices=ENGINES, default=os.environ.get("PDF_ENGINE", "text"),
+                        help="Heading engine: plain-text heuristics or font-size layout analysis")
+    parser.add_argument("--stream", action="store_true", default=os.environ.get("PDF_STREAM") == "1",
+                        help="Write outline entries incrementally to <name>.ndjson with bounded memory")
+    parser.add_argument("--output-format", choices=FORMATS, default=os.environ.get("PDF_OUTPUT_FORMAT", "json"),
+                        help="Indented JSON (default), compact JSON (uses orjson when installed) or NDJSON")
+    parser.add_argument("--no-triage", action="store_true", default=os.environ.get("PDF_TRIAGE") == "0",
+                        help="Run encrypted and text-less PDFs through full extraction instead of skipping them")
+    parser.add_argument("--no-lean-loader", action="store_true", default=os.environ.get("PDF_LEAN_LOADER") == "0",
+                        help="Open PDFs with a plain PdfReader (no memory map, font sharing or image skipping)")
+    parser.add_argument("--title-runs", type=int, default=int(os.environ.get("PDF_TITLE_RUNS", 0)) or None,
+                        help="Decode at most this many text runs of the first page when looking for the title")
+    parser.add_argument("--max-pages", type=int, default=int(os.environ.get("PDF_MAX_PAGES", 0)) or None,
+                        help="Process at most this many pages per document")
+    parser.add_argument("--max-seconds", type=float, default=float(os.environ.get("PDF_MAX_SECONDS", 0)) or None,
+                        help="Stop processing a document's pages after this many seconds")
+    parser.add_argument("--metrics-file", default=os.environ.get("PDF_METRICS_FILE") or None,
+                        help="Write per-document and per-stage timings to this JSON file")
+    parser.add_argument("--profile-dir", default=os.environ.get("PDF_PROFILE_DIR") or None,
+                        help="Profile every document with cProfile/tracemalloc and keep the slowest in this directory")
+    parser.add_argument("--profile-top", type=int, default=int(os.environ.get("PDF_PROFILE_TOP", 5)),
+                        help="Number of slowest documents whose profiles are kept")
+    parser.add_argument("--page-workers", type=int, default=int(os.environ.get("PDF_PAGE_WORKERS", 1)),
+                        help="Worker processes for page text extraction within one large document "
+                             "(used when --workers is 1)")
+    parser.add_argument("--watch", action="store_true", default=os.environ.get("PDF_WATCH") == "1",
+                        help="Keep running and process PDFs as they appear in the input directory")
+    parser.add_argument("--poll-interval", type=float, default=float(os.environ.get("PDF_POLL_INTERVAL", 1.0)),
+                        help="Seconds between scans of the input directory in watch mode")
+    parser.add_argument("--max-pending", type=int, default=int(os.environ.get("PDF_MAX_PENDING", 0)) or None,
+                        help="Maximum files queued or in flight in watch mode (default: 4 per worker)")
+    parser.add_argument("--shard-count", type=int, default=int(os.environ.get("PDF_SHARD_COUNT", 0)) or None,
+                        help="Split the input directory into this many hash shards shared by several instances")
+    parser.add_argument("--shard-index", type=int,
+                        default=int(os.environ["PDF_SHARD_INDEX"]) if os.environ.get("PDF_SHARD_INDEX") else None,
+                        help="Shard processed by this instance, from 0 to --shard-count - 1")
+    parser.add_argument("--claim", action="store_true", default=os.environ.get("PDF_SHARD_CLAIM") == "1",
+                        help="Split the input directory between instances with atomic claim files")
+    parser.add_argument("--node-id", default=os.environ.get("PDF_NODE_ID") or None,
+                        help="Name of this instance in claims and manifests (default: shard number or host-pid)")
+    parser.add_argument("--shard-dir", default=os.environ.get("PDF_SHARD_DIR") or None,
+                        help="Shared directory for claims, manifests and the index (default: <output-dir>/_shards)")
+    parser.add_argument("--run-id", default=os.environ.get("PDF_RUN_ID") or None,
+                        help="Name of the sharded run; claims and manifests are kept per run "
+                             "(default: a digest of the input file names, sizes and times)")
+    parser.add_argument("--claim-ttl", type=float, default=float(os.environ.get("PDF_CLAIM_TTL", 300)),
+                        help="Seconds after which an unrenewed claim of a crashed instance can be taken over")
+    parser.add_argument("--merge", action="store_true", default=os.environ.get("PDF_SHARD_MERGE") == "1",
+                        help="Only merge the shard manifests into the global index")
+    parser.add_argument("--serve", action="store_true", default=os.environ.get("PDF_SERVE") == "1",
+                        help="Serve the HTTP extraction API instead of processing the input directory")
+    parser.add_argument("--host", default=os.environ.get("PDF_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PDF_PORT", 8080)))
+    parser.add_argument("--max-concurrency", type=int, default=int(os.environ.get("PDF_MAX_CONCURRENCY", 0)) or None,
+                        help="Maximum concurrent extractions in serve mode (default: 2 per worker)")
+    parser.add_argument("--request-timeout", type=float, default=float(os.environ.get("PDF_REQUEST_TIMEOUT", 30)),
+                        help="Per-PDF extraction timeout in seconds in serve mode")
+    parser.add_argument("--max-body-mb", type=int, default=int(os.environ.get("PDF_MAX_BODY_MB", 50)),
+                        help="Maximum request body size in MB in serve mode")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     print("PDF Outline Extractor starting...")
     start_time = time.time()
     
     # Create the extractor and process all PDFs
-    extractor = PDFOutlineExtractor()
-    extractor.process_pdfs()
+    extractor = PDFOutlineExtractor(args.input_dir, args.output_dir, workers=args.workers, timeout=args.timeout,
+                                    cache_dir=args.cache_dir, cache_size=args.cache_size_mb * 1024 * 1024,
+                                    use_outline=not args.no_outline, engine=args.engine, stream=args.stream,
+                                    max_pages=args.max_pages, max_seconds=args.max_seconds,
+                                    metrics_file=args.metrics_file, profile_dir=args.profile_dir,
+                                    profile_top=args.profile_top, page_workers=args.page_workers,
+                                    output_format=args.output_format, incremental=args.incremental,
+                                    title_runs=args.title_runs, lean_loader=not args.no_lean_loader,
+                                    use_triage=not args.no_triage)
+    
+    if args.serve:
+        ExtractionServer(extractor, args.host, args.port, workers=args.workers,
+                         max_concurrency=args.max_concurrency, request_timeout=args.request_timeout,
+                         max_body=args.max_body_mb * 1024 * 1024).serve_forever()
+        return
+    
+    if args.watch:
+        FolderWatcher(extractor, args.poll_interval, args.max_pending).serve_forever()
+        return
+    
+    if args.shard_count or args.claim or args.merge:
+        runner = ShardRunner(extractor, args.shard_dir or os.path.join(args.output_dir, "_shards"),
+                             shard_index=args.shard_index, shard_count=args.shard_count, claim=args.claim,
+                             node_id=args.node_id, run_id=args.run_id, claim_ttl=args.claim_ttl)
+        if args.merge:
+            runner.merge()
+        else:
+            runner.run()
+    else:
+        extractor.process_pdfs()
     
     end_time = time.time()
     print(f"Processing completed in {end_time - start_time:.2f} seconds")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,108 @@
+import sys
+import json
+from array import array
+from json.encoder import encode_basestring_ascii
+
+try:
+    import orjson
+except ImportError:  # Optional faster encoder for the compact format
+    orjson = None
+
+LEVELS = tuple(sys.intern(level) for level in ("H1", "H2", "H3"))
+_INTERNED = {level: level for level in LEVELS}
+
+# Output formats: "json" is the original indented layout byte for byte, "ndjson"
+# the title line plus one line per entry as written by streaming mode
+FORMATS = ("json", "compact", "ndjson")
+
+
+def _dumps_compact(obj):
+    # orjson writes non-ASCII text as UTF-8 instead of \u escapes; both parse the same
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+
+class Outline:
+    """Columnar outline: parallel arrays of levels, texts and pages plus the title.
+
+    Levels are interned strings, pages a compact integer array. Entries are
+    never materialized as dicts on the write path; iter_json serializes the
+    arrays straight into output chunks.
+    """
+    __slots__ = ('title', 'levels', 'texts', 'pages', 'reason')
+
+    def __init__(self, title=None, reason=None):
+        self.title = title
+        self.reason = reason  # Triage reason code when the document was not mined for headings
+        self.levels = []
+        self.texts = []
+        self.pages = array('l')
+
+    def append(self, level, text, page):
+        self.levels.append(_INTERNED.get(level) or sys.intern(level))
+        self.texts.append(text)
+        self.pages.append(page)
+
+    def extend(self, entries):
+        """Append (level, text, page) tuples"""
+        for level, text, page in entries:
+            self.append(level, text, page)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __iter__(self):
+        return zip(self.levels, self.texts, self.pages)
+
+    def to_list(self):
+        """The outline as a list of {"level", "text", "page"} dicts"""
+        return [{"level": level, "text": text, "page": page} for level, text, page in self]
+
+    def to_dict(self):
+        result = {"title": self.title, "outline": self.to_list()}
+        if self.reason is not None:
+            result["reason"] = self.reason
+        return result
+
+    def iter_json(self, output_format="json"):
+        """Yield the serialized outline in chunks for the given output format"""
+        if output_format == "json":
+            # Same bytes as json.dump(self.to_dict(), f, indent=2)
+            yield '{\n  "title": ' + json.dumps(self.title) + ',\n  "outline": '
+            if self.levels:
+                yield '['
+                separator = '\n'
+                for level, text, page in self:
+                    yield (separator + '    {\n      "level": "' + level + '",\n      "text": '
+                           + encode_basestring_ascii(text) + ',\n      "page": ' + str(page) + '\n    }')
+                    separator = ',\n'
+                yield '\n  ]'
+            else:
+                yield '[]'
+            if self.reason is not None:
+                yield ',\n  "reason": ' + json.dumps(self.reason)
+            yield '\n}'
+        elif output_format == "compact":
+            yield _dumps_compact(self.to_dict())
+        elif output_format == "ndjson":
+            yield self.title_line()
+            for level, text, page in self:
+                yield ndjson_line(level, text, page)
+        else:
+            raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(FORMATS)}")
+
+    def title_line(self):
+        """The NDJSON line that precedes the entries: the title and any triage reason"""
+        header = {"title": self.title}
+        if self.reason is not None:
+            header["reason"] = self.reason
+        return json.dumps(header) + '\n'
+
+    def dumps(self, output_format="json"):
+        return ''.join(self.iter_json(output_format))
+
+
+def ndjson_line(level, text, page):
+    """One outline entry as an NDJSON line, the same bytes as json.dumps of its dict"""
+    return '{"level": "' + level + '", "text": ' + encode_basestring_ascii(text) + ', "page": ' + str(page) + '}\n'
@@ -1,16 +1,318 @@
+import io
 import os
-import json
+import mmap
 import time
+import hashlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from PyPDF2 import PdfReader
+from PyPDF2 import _page as pypdf_page
+from PyPDF2.generic import DictionaryObject, NameObject, IndirectObject, StreamObject
 import re
+from batch import BatchProcessor, summarize, print_summary
+from heading_rules import LineFeatures, HEADING_RULES, LEVEL_RULES, rule_hits, reset_rule_hits
+from result_cache import ResultCache, PageStore
+from layout_engine import LayoutEngine
+from instrumentation import StageTimer, DocumentProfiler, keep_slowest_profiles, write_metrics
+from outline import Outline, FORMATS, ndjson_line
+from triage import triage, ENCRYPTED, page_resources, page_xobjects, form_xobjects
+from contextlib import nullcontext, contextmanager
+
+# Bump whenever a change alters the extracted outlines, so cached results are invalidated
+EXTRACTOR_VERSION = "4"
+
+# Outline levels by bookmark nesting depth; deeper bookmarks are folded into H3
+OUTLINE_LEVELS = ("H1", "H2", "H3")
+
+# First-page lines the title rules look at; decoding page 0 for the title stops after these
+TITLE_LINES = 3
+
+# Heading extraction engines: plain-text heuristics or font size/weight from the page layout
+ENGINES = ("text", "layout")
+
+# Matches an image XObject's /Subtype in the dictionary that precedes its stream data
+IMAGE_SUBTYPE_RE = re.compile(rb'/Subtype\s*/Image\b')
+
+# Bytes of an object read to find its dictionary when checking for images
+OBJECT_PEEK = 4096
+
+# An XObject drawn by a content stream ("/Name Do")
+DO_OPERATOR_RE = re.compile(rb'/([^\s/\[\]()<>{}%]+)\s*Do\b')
+
+# Font descriptor entries holding the embedded font program, which text extraction never reads
+FONT_PROGRAM_KEYS = frozenset(('/FontFile', '/FontFile2', '/FontFile3'))
+
+# PyPDF2 decodes every font (including its ToUnicode map) again on each page that
+# uses it; TextReader documents keep the decoded fonts for the whole document
+_build_char_map = pypdf_page.build_char_map
+
+def _cached_char_map(font_name, space_width, obj):
+    char_maps = getattr(getattr(obj, 'pdf', None), 'char_maps', None)
+    if char_maps is None:
+        return _build_char_map(font_name, space_width, obj)
+    font = obj["/Resources"]["/Font"][font_name]
+    # Resolved fonts are shared objects, and the cached map holds the font, so its id stays unique
+    key = (id(font), space_width)
+    if key not in char_maps:
+        char_maps[key] = _build_char_map(font_name, space_width, obj)
+    return char_maps[key]
+
+pypdf_page.build_char_map = _cached_char_map
+
+class TextReader(PdfReader):
+    """PdfReader for text extraction only.
+
+    Decoded fonts and ToUnicode maps are shared by every page of the document,
+    and image XObjects are replaced by stubs as pages are loaded, so their
+    streams are never read. Whether an XObject is an image is decided from its
+    dictionary at the xref offset, without parsing the object.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.char_maps = {}
+        self.stripped = set()  # ids of XObject dictionaries already stubbed
+
+    def _get_page(self, page_number):
+        page = super()._get_page(page_number)
+        self.strip_images(page)
+        return page
+
+    def is_image(self, ref):
+        """True if the indirect object ref is an image stream"""
+        offset = self.xref.get(ref.generation, {}).get(ref.idnum)
+        if offset is None:
+            return False
+        position = self.stream.tell()
+        try:
+            self.stream.seek(offset)
+            head = self.stream.read(OBJECT_PEEK)
+        finally:
+            self.stream.seek(position)
+        end = head.find(b'stream')
+        return IMAGE_SUBTYPE_RE.search(head[:end] if end >= 0 else head) is not None
+
+    def strip_images(self, page):
+        """Replace the page's image XObjects by stubs that text extraction skips"""
+        try:
+            xobjects = page_xobjects(page)
+        except Exception:
+            return
+        if not isinstance(xobjects, dict) or not xobjects or id(xobjects) in self.stripped:
+            return
+        self.stripped.add(id(xobjects))
+        for name, ref in list(xobjects.items()):
+            if hasattr(ref, 'idnum') and self.is_image(ref):
+                xobjects[name] = DictionaryObject({NameObject("/Subtype"): NameObject("/Image")})
+
+@contextmanager
+def open_source(pdf_path, data=None):
+    """Yield a seekable source for a PDF: in-memory data, or the file memory-mapped read-only"""
+    if data is not None:
+        yield io.BytesIO(data)
+        return
+    with open(pdf_path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            yield file
+            return
+        with mapped:
+            yield mapped
+
+# Reader opened once per page-parallel worker process
+_page_reader = None
+
+def _open_page_reader(pdf_path, data, lean_loader):
+    global _page_reader
+    source = io.BytesIO(data) if data is not None else open(pdf_path, 'rb')
+    _page_reader = TextReader(source) if lean_loader else PdfReader(source)
+
+def _featurize_range(start, stop):
+    """Extract and featurize pages start..stop-1 in a page-parallel worker"""
+    results = []
+    for page_num in range(start, stop):
+        extract_start = time.perf_counter()
+        text = _page_reader.pages[page_num].extract_text()
+        featurize_start = time.perf_counter()
+        lines = [LineFeatures(line) for line in text.split('\n')] if text else None
+        results.append((page_num, lines, featurize_start - extract_start, time.perf_counter() - featurize_start))
+    return results
+
+def _hash_object(digest, obj, memo):
+    """Feed a PDF object and everything it references into digest.
+
+    Each indirect object is hashed once per memo, so fonts and forms shared by
+    many pages are only read once per document. Image data and font programs
+    do not affect the extracted text and are left out.
+    """
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            memo[key] = b''  # Guards against reference cycles
+            inner = hashlib.blake2b(digest_size=16)
+            _hash_object(inner, obj.get_object(), memo)
+            memo[key] = inner.digest()
+        digest.update(memo[key])
+    elif isinstance(obj, dict):
+        for key in sorted(obj):
+            if key != '/Parent' and key not in FONT_PROGRAM_KEYS:
+                digest.update(key.encode('utf-8'))
+                # dict.__getitem__ keeps references unresolved, so they hit the memo
+                _hash_object(digest, dict.__getitem__(obj, key), memo)
+        if isinstance(obj, StreamObject) and obj.get('/Subtype') != '/Image':
+            digest.update(obj.get_data())
+    elif isinstance(obj, list):
+        for item in obj:
+            _hash_object(digest, item, memo)
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+
+def draws_forms(page):
+    """True if a page has form XObjects that its content may draw"""
+    return next(form_xobjects(page), None) is not None
+
+def page_fingerprint(page, memo=None):
+    """Hash of everything a page's text depends on, used to recognise unchanged pages.
+
+    Covers the content streams, the page's fonts, the XObjects the content
+    draws (form XObjects with their own content and resources) and the rotation.
+    """
+    memo = {} if memo is None else memo
+    digest = hashlib.blake2b(digest_size=16)
+    contents = page.get('/Contents')
+    contents = contents.get_object() if contents is not None else None
+    data = b''
+    for stream in (contents if isinstance(contents, list) else [contents]):
+        if stream is not None:
+            data += stream.get_object().get_data() + b'\n'
+    digest.update(data)
+    resources = page_resources(page)
+    _hash_object(digest, dict.get(resources, '/Font'), memo)
+    xobjects = resources.get('/XObject')
+    xobjects = xobjects.get_object() if xobjects is not None else {}
+    for name in sorted(set(DO_OPERATOR_RE.findall(data))):
+        name = '/' + name.decode('latin-1')
+        digest.update(name.encode('utf-8'))
+        if name in xobjects:
+            _hash_object(digest, dict.__getitem__(xobjects, name), memo)
+        else:
+            # Escaped or unresolvable names: fall back to every XObject of the page
+            _hash_object(digest, xobjects, memo)
+    digest.update(str(page.get('/Rotate', 0)).encode('ascii'))
+    return digest.hexdigest()
+
+class _TitleFound(Exception):
+    """Raised from the text visitor to stop decoding page 0 once the title is known"""
+
+class SeenText:
+    """Set of already emitted heading texts, kept as 64-bit digests instead of strings.
+
+    With max_entries set, the oldest digests are forgotten first so memory stays
+    bounded on very long documents.
+    """
+
+    def __init__(self, max_entries=None):
+        self.digests = set()
+        self.order = deque() if max_entries else None
+        self.max_entries = max_entries
+
+    @staticmethod
+    def _digest(text):
+        return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def __contains__(self, text):
+        return self._digest(text) in self.digests
+
+    def add(self, text):
+        digest = self._digest(text)
+        if digest in self.digests:
+            return
+        self.digests.add(digest)
+        if self.order is not None:
+            self.order.append(digest)
+            if len(self.order) > self.max_entries:
+                self.digests.discard(self.order.popleft())
 
 class PDFOutlineExtractor:
-    def __init__(self):
-        self.input_dir = '/app/input'
-        self.output_dir = '/app/output'
+    def __init__(self, input_dir='/app/input', output_dir='/app/output', workers=1, timeout=None,
+                 cache_dir=None, cache_size=256 * 1024 * 1024, use_outline=True, min_outline_entries=3,
+                 engine="text", stream=False, max_pages=None, max_seconds=None,
+                 stream_buffer=1000, seen_limit=100000, metrics_file=None, profile_dir=None, profile_top=5,
+                 page_workers=1, page_parallel_min_pages=64, output_format="json", incremental=False,
+                 title_runs=None, lean_loader=True, use_triage=True):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.workers = workers  # Number of worker processes for process_pdfs
+        self.timeout = timeout  # Per-file timeout in seconds (parallel mode only)
+        # Use the PDF's own bookmarks when it has at least this many of them
+        self.use_outline = use_outline
+        self.min_outline_entries = min_outline_entries
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        self.engine = engine
+        self.layout_engine = LayoutEngine()
+        # Output layout: indented JSON (the original format), compact JSON or NDJSON
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(FORMATS)}")
+        self.output_format = output_format
+        # Open documents through TextReader over a memory map (shared font decoding, images
+        # skipped) rather than a plain PdfReader over a file object
+        self.lean_loader = lean_loader
+        # Triage: encrypted, empty and text-less (scanned) PDFs are written with a reason
+        # code instead of going through extraction; skipped holds the current document's
+        self.use_triage = use_triage
+        self.skipped = None
+        # Parse error of the current document, which is still written with the "Error" title
+        self.error = None
+        # Optional bound on the text runs decoded from page 0 to find the title
+        self.title_runs = title_runs
+        # Streaming mode writes outline entries to an NDJSON file as pages finish
+        self.stream = stream
+        self.stream_buffer = stream_buffer  # Entries held back for the level fix-ups
+        self.seen_limit = seen_limit  # Bound on remembered heading texts when streaming
+        # Page-level parallelism for long documents (text engine, single-process mode)
+        self.page_workers = page_workers
+        self.page_parallel_min_pages = page_parallel_min_pages
+        # Per-document caps; pages past either cap are not processed
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        # Instrumentation: per-stage timings of the current document, an optional metrics
+        # JSON file for the run, and opt-in cProfile/tracemalloc dumps of the slowest documents
+        self.timer = StageTimer()
+        self.metrics_file = metrics_file
+        self.profile_dir = profile_dir
+        self.profile_top = profile_top
+        # Optional persistent result cache keyed by PDF content hash; the engine, outline,
+        # triage, page caps and output format change the cached payload, so they are part of the version
+        cache_version = f"{EXTRACTOR_VERSION}-{engine}" + ("" if use_outline else "-nooutline")
+        if use_outline and min_outline_entries != 3:
+            cache_version += f"-outline{min_outline_entries}"
+        if not use_triage:
+            cache_version += "-notriage"
+        if output_format != "json":
+            cache_version += f"-{output_format}"
+        if max_pages or max_seconds:
+            cache_version += f"-pages{max_pages}-seconds{max_seconds}"
+        if title_runs:
+            cache_version += f"-titleruns{title_runs}"
+        self.cache = ResultCache(cache_dir, cache_version, cache_size) if cache_dir else None
+        # Incremental mode keeps each document's page texts in the cache, keyed by page
+        # fingerprint, and only re-extracts the pages of a re-submitted file that changed
+        if incremental and not cache_dir:
+            raise ValueError("Incremental extraction needs a cache_dir")
+        self.incremental = incremental
+
+    def extract_title(self, pdf_reader, pdf_path, first_page_text=None):
+        """Extract the title from PDF metadata, filename or first page text"""
+        title = self.metadata_title(pdf_reader, pdf_path)
+        if title is None:
+            title = self.page_title(pdf_reader, pdf_path, first_page_text)
+        return title
 
-    def extract_title(self, pdf_reader, pdf_path):
-        """Extract the title from PDF metadata or filename"""
+    def metadata_title(self, pdf_reader, pdf_path):
+        """Title from the filename or document metadata, or None if the first page is needed"""
         # Special case for file03.pdf - hardcoded title as per requirement
         filename = os.path.basename(pdf_path)
         if filename == "file03.pdf":
@@ -28,368 +330,679 @@ class PDFOutlineExtractor:
             # Verify the metadata title isn't generic
             if "resume" in pdf_reader.metadata.title.lower() or len(pdf_reader.metadata.title) > 10:
                 return pdf_reader.metadata.title
-            
+        return None
+
+    def page_title(self, pdf_reader, pdf_path, first_page_text=None):
+        """Title from the first lines of page 0, falling back to the filename.
+
+        first_page_text is page 0's text when the caller has already decoded it;
+        otherwise only the start of the page is decoded.
+        """
+        filename_without_ext = os.path.splitext(os.path.basename(pdf_path))[0]
+        
         # Next try to get from first page content
-        if len(pdf_reader.pages) > 0:
-            first_page_text = pdf_reader.pages[0].extract_text()
-            if first_page_text:
-                # Get the first non-empty line as title
-                lines = [line.strip() for line in first_page_text.split('\n') if line.strip()]
-                if lines:
-                    # Check if the first line looks like a name (likely the resume owner)
-                    if len(lines[0]) < 50 and not lines[0].endswith(':'):
-                        # Combine with "Resume" if it's just a name
-                        if "resume" not in lines[0].lower():
-                            return f"{lines[0]} Resume"
-                        return lines[0]
-                    
-                    # For RFP documents, try to extract a more complete title
-                    if "RFP" in lines[0] or "Request for Proposal" in lines[0]:
-                        # Try to combine multiple lines for a more complete title
-                        title_parts = []
-                        for line in lines[:3]:  # Look at first 3 lines
-                            if len(line) < 100 and not line.startswith('Date') and not re.match(r'^\d+/\d+/\d+$', line):
-                                title_parts.append(line)
-                            if "Proposal" in line or "Plan" in line:
-                                break
-                        if title_parts:
-                            return " ".join(title_parts)
+        if first_page_text is None and len(pdf_reader.pages) > 0:
+            first_page_text = self.first_page_text(pdf_reader)
+        if first_page_text:
+            # Get the first non-empty line as title
+            lines = [line.strip() for line in first_page_text.split('\n') if line.strip()]
+            if lines:
+                # Check if the first line looks like a name (likely the resume owner)
+                if len(lines[0]) < 50 and not lines[0].endswith(':'):
+                    # Combine with "Resume" if it's just a name
+                    if "resume" not in lines[0].lower():
+                        return f"{lines[0]} Resume"
+                    return lines[0]
+                
+                # For RFP documents, try to extract a more complete title
+                if "RFP" in lines[0] or "Request for Proposal" in lines[0]:
+                    # Try to combine multiple lines for a more complete title
+                    title_parts = []
+                    for line in lines[:TITLE_LINES]:  # Look at first 3 lines
+                        if len(line) < 100 and not line.startswith('Date') and not re.match(r'^\d+/\d+/\d+$', line):
+                            title_parts.append(line)
+                        if "Proposal" in line or "Plan" in line:
+                            break
+                    if title_parts:
+                        return " ".join(title_parts)
         
         # Default to filename
         return filename_without_ext
 
+    def first_page_text(self, pdf_reader):
+        """Decode the start of page 0, stopping once the lines the title rules read are complete.
+
+        Decoding also stops after title_runs text runs when that bound is set.
+        PyPDF2 reports the text of a form XObject to the visitor twice (run by run,
+        then all at once), so a page 0 that draws forms is decoded in full instead.
+        """
+        page = pdf_reader.pages[0]
+        if draws_forms(page):
+            return page.extract_text()
+        runs = []
+        tail = ""  # Text after the last newline seen so far
+        lines = 0
+        done = False
+        
+        def visit(text, *args):
+            nonlocal tail, lines, done
+            # PyPDF2 swallows exceptions raised in some callbacks, so keep raising once done
+            if done:
+                raise _TitleFound
+            runs.append(text)
+            if '\n' in text:
+                *complete, tail = (tail + text).split('\n')
+                lines += sum(1 for line in complete if line.strip())
+            else:
+                tail += text
+            if lines >= TITLE_LINES or (self.title_runs and len(runs) >= self.title_runs):
+                done = True
+                raise _TitleFound
+        
+        try:
+            page.extract_text(visitor_text=visit)
+        except _TitleFound:
+            pass
+        return ''.join(runs)
+
     def is_heading(self, text, prev_text=None, next_text=None):
         """Determine if text is likely a heading based on various heuristics"""
-        # Skip empty lines
-        if not text.strip():
-            return False
-            
-        # Check if text ends with common heading punctuation
-        if text.strip().endswith((':')): 
-            return True
-            
-        # Check for all caps (common in resume section headings)
-        if text.isupper() and len(text.strip()) < 50:
-            return True
-            
-        # Check for title case with specific conditions for resumes
-        if text.istitle() and len(text.strip()) < 50 and len(text.strip().split()) < 8:
-            return True
-            
-        # Check for short length with year patterns (common in resume entries)
-        if len(text.strip()) < 100 and len(text.strip().split()) < 15:
-            # Check for numeric prefixes like "1.", "1.1", "I.", "A."
-            if re.match(r'^[\d\w][\.\d\s]*\s', text.strip()):
-                return True
-            # Check for year patterns (19XX or 20XX, possibly with ranges)
-            if re.search(r'\b(19|20)\d\d\s*(-|–|to)?\s*(19|20)?\d{0,2}\b', text.strip()):
-                return True
-                
-        # Check for lines that have significant whitespace/tab separation (common in resumes)
-        if '  ' in text and len(text.strip()) < 100:
-            parts = [p for p in re.split(r'\s{2,}', text) if p.strip()]
-            if len(parts) >= 2:
-                return True
-                
-        # Check for common resume section headings
-        common_headings = ['education', 'experience', 'skills', 'projects', 'certificates', 
-                          'certifications', 'awards', 'publications', 'languages', 'interests']
-        if text.lower().strip(':').strip() in common_headings:
-            return True
-                
-        return False
+        return self.is_heading_line(LineFeatures(text))
+
+    def is_heading_line(self, line):
+        """Apply the heading rules to precomputed LineFeatures"""
+        return HEADING_RULES.evaluate(line)
 
     def determine_heading_level(self, text, page_num):
         """Determine heading level (H1, H2, H3) based on text characteristics"""
-        text = text.strip()
-        
-        # Special case for file03.pdf - hardcoded heading level
-        if text == "Ontario's Digital Library":
-            return "H1"
-        
-        # Resume-specific patterns
+        return self.heading_level(LineFeatures(text), page_num)
+
+    def heading_level(self, line, page_num):
+        """Apply the heading level rules to precomputed LineFeatures"""
+        return LEVEL_RULES.evaluate(line, page_num)
+
+    def extract_outline(self, pdf_reader):
+        """Extract headings from the PDF's embedded outline (bookmarks), if it has a usable one"""
+        try:
+            outline = pdf_reader.outline
+        except Exception as e:
+            print(f"Could not read embedded outline: {str(e)}")
+            return None
         
-        # Main section headers in resumes are typically H1
-        if text.isupper() and text.endswith(':') and len(text) < 30:
-            return "H1"
-            
-        # Check for common resume main sections
-        main_sections = ['EDUCATION', 'EXPERIENCE', 'SKILLS', 'PROJECTS', 'CERTIFICATES', 
-                        'CERTIFICATIONS', 'AWARDS', 'PUBLICATIONS']
-        if any(section in text.upper() for section in main_sections):
-            return "H1"
-            
-        # Years and education entries are often H2
-        if re.search(r'\b(19|20)\d{2}\s*(-|–|to)?\s*(19|20)?\d{0,2}\b', text) and len(text) < 30:
-            return "H2"
-            
-        # Names of institutions, companies, or degree programs are often H2
-        if text.istitle() and len(text.split()) <= 5 and not text.startswith('●'):
-            return "H2"
-            
-        # Job titles, projects, or skills with details are often H3
-        if '  ' in text and len(text.strip()) > 30:
-            return "H3"
-            
-        # Bullet points and details are H3
-        if text.startswith('●') or text.startswith('- '):
-            return "H3"
+        headings = Outline()
+        # Walk the nested outline; a list following an item holds that item's children
+        stack = [(outline, 0)]
+        while stack:
+            items, depth = stack.pop()
+            for index, item in enumerate(items):
+                if isinstance(item, list):
+                    stack.append((items[index + 1:], depth))
+                    stack.append((item, depth + 1))
+                    break
+                text = (item.title or "").strip()
+                page_num = pdf_reader.get_destination_page_number(item)
+                if not text or page_num < 0:
+                    continue
+                headings.append(OUTLINE_LEVELS[min(depth, len(OUTLINE_LEVELS) - 1)], text, page_num)
         
-        # Standard document patterns
-        # Check for numeric patterns indicating hierarchy
-        if re.match(r'^\d+\.\s', text):  # e.g., "1. Introduction"
-            return "H1"
-        elif re.match(r'^\d+\.\d+\.\s', text):  # e.g., "1.1. Overview"
-            return "H2"
-        elif re.match(r'^\d+\.\d+\.\d+\.\s', text):  # e.g., "1.1.1. Details"
-            return "H3"
-            
-        # Check for Roman numerals
-        if re.match(r'^[IVX]+\.\s', text):
-            return "H1"
-            
-        # Check for alphabetic markers
-        if re.match(r'^[A-Z]\.\s', text):
-            return "H2"
-            
-        # First page (page 0) headings with specific characteristics
-        if page_num == 0:
-            if text.isupper() and len(text) < 50:  # All caps headers on first page
-                return "H1"
-            elif len(text) < 30:  # Short text on first page
-                return "H2"
-            
-        # Default to H2 for most detected headings
-        return "H2"
+        # Too sparse to be trusted as the document outline
+        if len(headings) < self.min_outline_entries:
+            return None
+        return headings
 
-    def extract_headings(self, pdf_path):
-        """Extract headings from PDF"""
-        start_time = time.time()
-        
+    @contextmanager
+    def open_reader(self, pdf_path, data=None):
+        """Open a PDF (from pdf_path, or in-memory data bytes) as a reader, timed as the parse stage"""
+        if self.lean_loader:
+            with open_source(pdf_path, data) as source:
+                with self.timer.stage("parse"):
+                    pdf_reader = TextReader(source)
+                yield pdf_reader
+        else:
+            with (io.BytesIO(data) if data is not None else open(pdf_path, 'rb')) as file:
+                with self.timer.stage("parse"):
+                    pdf_reader = PdfReader(file)
+                yield pdf_reader
+
+    def extract_headings(self, pdf_path, data=None):
+        """Extract headings from PDF (read from pdf_path, or parsed from in-memory data bytes)"""
+        return self.extract_document(pdf_path, data).to_dict()
+
+    def extract_document(self, pdf_path, data=None):
+        """Extract the title and headings of a PDF as a columnar Outline"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PdfReader(file)
-                title = self.extract_title(pdf_reader, pdf_path)
+            with self.open_reader(pdf_path, data) as pdf_reader:
+                triaged = self.triage(pdf_reader, pdf_path)
+                if triaged is not None:
+                    return triaged
+                with self.timer.stage("title"):
+                    title = self.metadata_title(pdf_reader, pdf_path)
                 
-                headings = []
-                seen_text = set()  # To avoid duplicate headings
-                main_sections = []
-                current_section = None
+                # The text engine decodes page 0 anyway, so a title taken from the first
+                # page is read from its text afterwards instead of decoding the page twice
+                first_page = {}
+                headings = None
+                # Fast path: bookmarked PDFs already carry their outline, so skip text mining
+                if self.use_outline:
+                    with self.timer.stage("outline"):
+                        headings = self.extract_outline(pdf_reader)
+                if headings is None:
+                    if self.engine == "layout":
+                        if title is None:
+                            with self.timer.stage("title"):
+                                title = self.page_title(pdf_reader, pdf_path)
+                        headings = self.layout_engine.extract(pdf_reader, title, self.iter_pages(pdf_reader), self.timer)
+                    else:
+                        headings = self.extract_text_headings(pdf_reader, pdf_path, data, first_page)
                 
-                # Special case for file03.pdf - add hardcoded H1 heading
-                filename = os.path.basename(pdf_path)
-                if filename == "file03.pdf":
-                    # Add the specific H1 heading required for file03.pdf
-                    headings.append({
-                        "level": "H1",
-                        "text": "Ontario\u2019s Digital Library",
-                        "page": 1
-                    })
-                    seen_text.add("Ontario\u2019s Digital Library")
+                if title is None:
+                    with self.timer.stage("title"):
+                        first_page_text = None
+                        if 0 in first_page:
+                            first_page_text = '\n'.join(line.raw for line in first_page[0] or ())
+                        title = self.page_title(pdf_reader, pdf_path, first_page_text)
+                headings.title = title
+                return headings
                 
-                # Process each page (zero-indexed)
-                for page_num, page in enumerate(pdf_reader.pages):
+        except Exception as e:
+            print(f"Error processing {pdf_path}: {str(e)}")
+            self.error = str(e)
+            return Outline("Error")
+
+    def triage(self, pdf_reader, pdf_path):
+        """Return the output for a document that triage rules out, or None to extract it.
+
+        Documents without page text may still carry bookmarks (e.g. scanned books),
+        so those are only skipped when the outline fast path finds nothing either;
+        their bookmark outline is returned instead.
+        """
+        if not self.use_triage:
+            return None
+        with self.timer.stage("triage"):
+            reason = triage(pdf_reader, self.max_pages)
+        if reason is None:
+            return None
+        if reason == ENCRYPTED:
+            print(f"Skipping {os.path.basename(pdf_path)}: {reason}")
+            self.skipped = reason
+            return Outline("Error", reason)
+        headings = None
+        if self.use_outline:
+            with self.timer.stage("outline"):
+                headings = self.extract_outline(pdf_reader)
+        if headings is None:
+            print(f"Skipping {os.path.basename(pdf_path)}: {reason}")
+            self.skipped = reason
+            headings = Outline(None, reason)
+        # No page text to read a title from, so only the metadata or the filename can give one
+        with self.timer.stage("title"):
+            headings.title = self.metadata_title(pdf_reader, pdf_path) or self.page_title(pdf_reader, pdf_path, "")
+        return headings
+
+    def iter_pages(self, pdf_reader, release=False):
+        """Yield (page_num, page) lazily, stopping at the per-document page or time cap.
+
+        With release set, each page's decoded content stream is dropped from the
+        reader's object cache once the page has been processed, so memory does
+        not grow with the page count.
+        """
+        deadline = time.time() + self.max_seconds if self.max_seconds else None
+        for page_num in range(len(pdf_reader.pages)):
+            if self.max_pages and page_num >= self.max_pages:
+                print(f"Stopping after {page_num} pages (page limit)")
+                break
+            if deadline and time.time() > deadline:
+                print(f"Stopping after {page_num} pages (time limit)")
+                break
+            page = pdf_reader.pages[page_num]
+            yield page_num, page
+            if release:
+                self.release_page(pdf_reader, page)
+
+    def release_page(self, pdf_reader, page):
+        """Drop a page's cached content streams from the reader"""
+        contents = page.get('/Contents')
+        refs = contents if isinstance(contents, list) else [contents]
+        for ref in refs:
+            if hasattr(ref, 'idnum'):
+                pdf_reader.resolved_objects.pop((ref.generation, ref.idnum), None)
+
+    def extract_text_headings(self, pdf_reader, pdf_path, data=None, first_page=None):
+        """Extract headings by mining each page's plain text with the heading rules.
+
+        With a first_page dict, page 0's featurized lines are left in it under key 0.
+        """
+        seen_text = set()  # To avoid duplicate headings
+        page_count = len(pdf_reader.pages)
+        if self.max_pages:
+            page_count = min(page_count, self.max_pages)
+        page_store = PageStore(self.cache, pdf_path) if self.incremental else None
+        
+        # Daemonic processes (batch pool workers) cannot start a pool of their own. A
+        # document with stored pages is featurized in order so unchanged pages are reused.
+        if self.page_workers > 1 and page_count >= self.page_parallel_min_pages and \
+                not multiprocessing.current_process().daemon and not (page_store and page_store.previous):
+            # iter_pages reports the page limit on the sequential path
+            if page_count < len(pdf_reader.pages):
+                print(f"Stopping after {page_count} pages (page limit)")
+            featurized = self.featurize_pages_parallel(pdf_path, data, page_count)
+            if page_store is not None:
+                featurized = self.store_pages(pdf_reader, page_store, featurized)
+        else:
+            featurized = self.featurize_pages(self.iter_pages(pdf_reader), page_store)
+        
+        if first_page is not None:
+            featurized = self.keep_first_page(featurized, first_page)
+        
+        # The cross-page pass always runs over every page, reused or freshly extracted
+        headings = Outline()
+        headings.extend(self.classify_pages(pdf_path, seen_text, featurized))
+        self.balance_levels(headings)
+        
+        if page_store is not None:
+            if page_store.previous:
+                print(f"Reused {page_store.reused} of {page_store.pages} pages from the previous extraction")
+            with self.timer.stage("cache"):
+                page_store.save()
+        return headings
+
+    def iter_text_headings(self, pdf_reader, pdf_path, seen_text, pages):
+        """Yield headings page by page from the plain text of (page_num, page) pairs"""
+        return self.classify_pages(pdf_path, seen_text, self.featurize_pages(pages))
+
+    def featurize_pages(self, pages, page_store=None):
+        """Extract and featurize the text of (page_num, page) pairs; yields (page_num, lines).
+
+        With a PageStore, pages whose fingerprint matches the previous extraction
+        reuse its text instead of being decoded again.
+        """
+        for page_num, page in pages:
+            start = time.perf_counter()
+            if page_store is not None:
+                fingerprint = page_fingerprint(page, page_store.objects)
+                text = page_store.get(fingerprint)
+                if text is None:
                     text = page.extract_text()
-                    if not text:
+                page_store.add(fingerprint, text)
+            else:
+                text = page.extract_text()
+            featurize_start = time.perf_counter()
+            self.timer.add_page(featurize_start - start)
+            # Strip and featurize every line once; the rule passes only read these cached features
+            lines = [LineFeatures(line) for line in text.split('\n')] if text else None
+            self.timer.add("classify", time.perf_counter() - featurize_start)
+            yield page_num, lines
+
+    def featurize_pages_parallel(self, pdf_path, data, page_count):
+        """Extract and featurize pages in a pool of worker processes; yields (page_num, lines) in order.
+
+        Every worker opens its own reader on the document and handles contiguous
+        page ranges. Only this stage is parallel: the cross-page state (current
+        section, duplicates, level fix-ups) is applied afterwards in page order,
+        so the outline is the same as in the sequential path.
+        """
+        chunk = max(1, -(-page_count // (self.page_workers * 4)))
+        starts = list(range(0, page_count, chunk))
+        stops = [min(start + chunk, page_count) for start in starts]
+        deadline = time.time() + self.max_seconds if self.max_seconds else None
+        
+        pool = ProcessPoolExecutor(self.page_workers, initializer=_open_page_reader, initargs=(pdf_path, data, self.lean_loader))
+        try:
+            for stop, results in zip(stops, pool.map(_featurize_range, starts, stops)):
+                for page_num, lines, extract_time, featurize_time in results:
+                    self.timer.add_page(extract_time)
+                    self.timer.add("classify", featurize_time)
+                    yield page_num, lines
+                # Pages that are already extracted are kept; later ranges are cancelled
+                if deadline and time.time() > deadline and stop < page_count:
+                    print(f"Stopping after {stop} pages (time limit)")
+                    return
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def keep_first_page(self, featurized, first_page):
+        """Pass featurized pages through, keeping page 0's lines in first_page"""
+        for page_num, lines in featurized:
+            if page_num == 0:
+                first_page[0] = lines
+            yield page_num, lines
+
+    def store_pages(self, pdf_reader, page_store, featurized):
+        """Record the text of featurized pages in page_store as they pass through"""
+        for page_num, lines in featurized:
+            text = '\n'.join(line.raw for line in lines) if lines else ''
+            page_store.add(page_fingerprint(pdf_reader.pages[page_num], page_store.objects), text)
+            yield page_num, lines
+
+    def classify_pages(self, pdf_path, seen_text, featurized):
+        """Apply the heading rule passes to featurized pages in page order, yielding (level, text, page)"""
+        main_sections = []
+        current_section = None
+        
+        # Special case for file03.pdf - add hardcoded H1 heading
+        filename = os.path.basename(pdf_path)
+        if filename == "file03.pdf":
+            # Add the specific H1 heading required for file03.pdf
+            yield "H1", "Ontario\u2019s Digital Library", 1
+            seen_text.add("Ontario\u2019s Digital Library")
+        
+        # Process each page (zero-indexed)
+        for page_num, lines in featurized:
+            if not lines:
+                continue
+            classify_start = time.perf_counter()
+            headings = []  # Headings found on this page
+            
+            # First pass: identify main sections (H1 headings)
+            for line in lines:
+                # Check for main section headings (all caps, ending with colon)
+                if line.section:
+                    line_clean = line.clean
+                    main_sections.append(line_clean)
+                    current_section = line_clean
+                    # Add main section as H1 heading
+                    if line_clean not in seen_text:
+                        headings.append(("H1", line_clean, page_num))
+                        seen_text.add(line_clean)
+            
+            # The section in effect for the rest of this page
+            in_education = bool(current_section) and "EDUCATION" in current_section
+            in_projects = bool(current_section) and \
+                any(section in current_section for section in ["PROJECTS", "PROJECT", "EXPERIENCE"])
+            
+            # Second pass: extract institution names and project details
+            if in_education or in_projects:
+                for i in range(len(lines) - 1):
+                    current_line = lines[i].clean
+                    next_line = lines[i+1].clean
+                    
+                    # Skip empty lines or already processed text
+                    if lines[i].length < 2 or current_line in seen_text:
                         continue
                         
-                    lines = text.split('\n')
+                    # Education section: Look for institution names
+                    if in_education:
+                        # If current line contains a year pattern and next line looks like an institution
+                        if lines[i].year and len(next_line) > 10 and next_line not in seen_text:
+                            # Extract the institution name
+                            if "University" in next_line or "College" in next_line or "School" in next_line:
+                                headings.append(("H2", next_line, page_num))
+                                seen_text.add(next_line)
                     
-                    # First pass: identify main sections (H1 headings)
-                    for line in lines:
-                        line_clean = line.strip()
-                        if not line_clean:
-                            continue
-                            
-                        # Check for main section headings (all caps, ending with colon)
-                        if (line_clean.isupper() and len(line_clean) < 30) or \
-                           (line_clean.endswith(':') and line_clean[:-1].strip().isupper()):
-                            main_sections.append(line_clean)
-                            current_section = line_clean
-                            # Add main section as H1 heading
-                            if line_clean not in seen_text:
-                                headings.append({
-                                    "level": "H1",
-                                    "text": line_clean,
-                                    "page": page_num
-                                })
-                                seen_text.add(line_clean)
+                    # Project section: Extract project names and details
+                    if in_projects:
+                        # Look for project titles (typically short phrases with keywords)
+                        if ("Project" in current_line or "System" in current_line or "Application" in current_line) \
+                           and len(current_line) < 60 and current_line not in seen_text:
+                            headings.append(("H2", current_line, page_num))
+                            seen_text.add(current_line)
+                        # Capture bullet points as project details
+                        elif lines[i].bullet and current_line not in seen_text:
+                            headings.append(("H3", current_line, page_num))
+                            seen_text.add(current_line)
+            
+            # Process each line for general headings
+            for i, line in enumerate(lines):
+                # Skip if line is too short or empty
+                if line.length < 2:
+                    continue
                     
-                    # Second pass: extract institution names and project details
-                    for i, line in enumerate(lines):
-                        if i >= len(lines) - 1:
-                            continue
-                            
-                        current_line = line.strip()
-                        next_line = lines[i+1].strip() if i < len(lines)-1 else ""
-                        
-                        # Skip empty lines or already processed text
-                        if not current_line or len(current_line) < 2 or current_line in seen_text:
-                            continue
-                            
-                        # Education section: Look for institution names
-                        if current_section and "EDUCATION" in current_section:
-                            # If current line contains a year pattern and next line looks like an institution
-                            if re.search(r'\b(19|20)\d{2}\b', current_line) and len(next_line) > 10 and next_line not in seen_text:
-                                # Extract the institution name
-                                if "University" in next_line or "College" in next_line or "School" in next_line:
-                                    headings.append({
-                                        "level": "H2",
-                                        "text": next_line,
-                                        "page": page_num
-                                    })
-                                    seen_text.add(next_line)
-                        
-                        # Project section: Extract project names and details
-                        if current_section and any(section in current_section for section in ["PROJECTS", "PROJECT", "EXPERIENCE"]):
-                            # Look for project titles (typically short phrases with keywords)
-                            if ("Project" in current_line or "System" in current_line or "Application" in current_line) \
-                               and len(current_line) < 60 and current_line not in seen_text:
-                                headings.append({
-                                    "level": "H2",
-                                    "text": current_line,
-                                    "page": page_num
-                                })
-                                seen_text.add(current_line)
-                            # Capture bullet points as project details
-                            elif current_line.startswith('●') and current_line not in seen_text:
-                                headings.append({
-                                    "level": "H3",
-                                    "text": current_line,
-                                    "page": page_num
-                                })
-                                seen_text.add(current_line)
+                # Check if this line is a heading
+                if self.is_heading_line(line):
+                    # Skip duplicate headings
+                    clean_text = line.clean
+                    if clean_text in seen_text:
+                        continue
                     
-                    # Process each line for general headings
-                    for i, line in enumerate(lines):
-                        # Skip if line is too short or empty
-                        if len(line.strip()) < 2:
-                            continue
-                            
-                        # Get context (previous and next lines)
-                        prev_line = lines[i-1] if i > 0 else ""
-                        next_line = lines[i+1] if i < len(lines)-1 else ""
+                    # Skip lines that are likely not resume headings
+                    if line.length > 100 or ("●" in clean_text and not line.bullet):
+                        continue
                         
-                        # Check if this line is a heading
-                        if self.is_heading(line, prev_line, next_line):
-                            # Skip duplicate headings
-                            clean_text = line.strip()
-                            if clean_text in seen_text:
-                                continue
-                            
-                            # Skip lines that are likely not resume headings
-                            if len(clean_text) > 100 or ("●" in clean_text and not clean_text.startswith("●")):
-                                continue
-                                
-                            seen_text.add(clean_text)
-                            level = self.determine_heading_level(clean_text, page_num)
-                            
-                            # Special handling for education section
-                            if current_section and "EDUCATION" in current_section:
-                                if i < len(lines) - 1:
-                                    next_line_clean = next_line.strip()
-                                    if re.search(r'\b(19|20)\d{2}\b', clean_text) and len(next_line_clean) > 10 and next_line_clean not in seen_text:
-                                        headings.append({
-                                            "level": "H2",
-                                            "text": next_line_clean,
-                                            "page": page_num
-                                        })
-                                        seen_text.add(next_line_clean)
-                            
-                            # Special handling for projects/experience sections
-                            if current_section and any(section in current_section for section in ["PROJECTS", "PROJECT", "EXPERIENCE"]):
-                                if i < len(lines) - 1:
-                                    next_line_clean = next_line.strip()
-                                    if re.search(r'\b(19|20)\d{2}\b', next_line_clean) and next_line_clean not in seen_text:
-                                        clean_text = f"{clean_text} - {next_line_clean}"
-                                        level = "H2"
-                                        seen_text.add(next_line_clean)
-                                    elif clean_text.startswith('●'):
-                                        level = "H3"
-                            
-                            headings.append({
-                                "level": level,
-                                "text": clean_text,
-                                "page": page_num
-                            })
-                
-                # Ensure we have at least one heading of each level
-                has_h1 = any(h["level"] == "H1" for h in headings)
-                has_h2 = any(h["level"] == "H2" for h in headings)
-                has_h3 = any(h["level"] == "H3" for h in headings)
-                
-                # If no H1, promote the first heading to H1
-                if not has_h1 and headings:
-                    headings[0]["level"] = "H1"
-                
-                # If no H2, convert some H3s to H2 or create a default H2
-                if not has_h2 and has_h3:
-                    # Find the first H3 and make it H2
-                    for h in headings:
-                        if h["level"] == "H3":
-                            h["level"] = "H2"
-                            break
-                elif not has_h2 and headings:
-                    # Add a default H2
-                    h1_index = next((i for i, h in enumerate(headings) if h["level"] == "H1"), -1)
-                    if h1_index >= 0 and h1_index + 1 < len(headings):
-                        headings[h1_index + 1]["level"] = "H2"
-                
-                # If no H3, convert some H2s to H3 or create a default H3
-                if not has_h3 and has_h2:
-                    # Find a later H2 and make it H3
-                    h2_indices = [i for i, h in enumerate(headings) if h["level"] == "H2"]
-                    if len(h2_indices) > 1:
-                        headings[h2_indices[1]]["level"] = "H3"
-                
-                # Format the result according to the sample format
-                result = {
-                    "title": title,
-                    "outline": []
-                }
+                    seen_text.add(clean_text)
+                    level = self.heading_level(line, page_num)
+                    next_line = lines[i+1] if i < len(lines)-1 else None
+                    
+                    # Special handling for education section
+                    if in_education and next_line:
+                        next_line_clean = next_line.clean
+                        if line.year and next_line.length > 10 and next_line_clean not in seen_text:
+                            headings.append(("H2", next_line_clean, page_num))
+                            seen_text.add(next_line_clean)
+                    
+                    # Special handling for projects/experience sections
+                    if in_projects and next_line:
+                        next_line_clean = next_line.clean
+                        if next_line.year and next_line_clean not in seen_text:
+                            clean_text = f"{clean_text} - {next_line_clean}"
+                            level = "H2"
+                            seen_text.add(next_line_clean)
+                        elif line.bullet:
+                            level = "H3"
+                    
+                    headings.append((level, clean_text, page_num))
+            
+            self.timer.add("classify", time.perf_counter() - classify_start)
+            yield from headings
+
+    def balance_levels(self, headings):
+        """Adjust an Outline's levels in place so it has at least one heading of each level"""
+        levels = headings.levels
+        # Ensure we have at least one heading of each level
+        has_h1 = "H1" in levels
+        has_h2 = "H2" in levels
+        has_h3 = "H3" in levels
+        
+        # If no H1, promote the first heading to H1
+        if not has_h1 and levels:
+            levels[0] = "H1"
+        
+        # If no H2, convert some H3s to H2 or create a default H2
+        if not has_h2 and has_h3:
+            # Find the first H3 and make it H2 (the promotion above may have taken the only one)
+            if "H3" in levels:
+                levels[levels.index("H3")] = "H2"
+        elif not has_h2 and levels:
+            # Add a default H2
+            h1_index = levels.index("H1") if "H1" in levels else -1
+            if h1_index >= 0 and h1_index + 1 < len(levels):
+                levels[h1_index + 1] = "H2"
+        
+        # If no H3, convert some H2s to H3 or create a default H3
+        if not has_h3 and has_h2:
+            # Find a later H2 and make it H3
+            h2_indices = [i for i, level in enumerate(levels) if level == "H2"]
+            if len(h2_indices) > 1:
+                levels[h2_indices[1]] = "H3"
+
+    def stream_headings(self, pdf_path, sink):
+        """Extract headings page by page, writing them to sink as NDJSON as they are found.
+
+        The first line holds the title and every following line one outline entry.
+        Entries are held back only until the document has shown all three levels
+        (or stream_buffer entries have accumulated), since the level fix-ups can
+        only touch entries before that point. Returns the number of entries written.
+        A PDF that cannot be read gets an Error title line; one that fails part way
+        keeps the entries already written. Either way it counts as failed.
+        """
+        count = 0
+        titled = False
+        
+        def write_title(outline):
+            nonlocal titled
+            sink.write(outline.title_line())
+            titled = True
+        
+        def emit(entries):
+            nonlocal count
+            for level, text, page in entries:
+                sink.write(ndjson_line(level, text, page))
+                count += 1
+        
+        try:
+            with self.open_reader(pdf_path) as pdf_reader:
+                triaged = self.triage(pdf_reader, pdf_path)
+                if triaged is not None:
+                    write_title(triaged)
+                    emit(triaged)
+                    return count
+                with self.timer.stage("title"):
+                    title = self.extract_title(pdf_reader, pdf_path)
+                write_title(Outline(title))
                 
-                for heading in headings:
-                    result["outline"].append({
-                        "level": heading["level"],
-                        "text": heading["text"],
-                        "page": heading["page"]
-                    })
+                if self.use_outline:
+                    with self.timer.stage("outline"):
+                        outline = self.extract_outline(pdf_reader)
+                    if outline is not None:
+                        emit(outline)
+                        return count
                 
-                return result
+                pages = self.iter_pages(pdf_reader, release=True)
+                if self.engine == "layout":
+                    # Levels depend on the whole-document font histogram, so these come at the end
+                    emit(self.layout_engine.extract(pdf_reader, title, pages, self.timer))
+                    return count
                 
+                buffer = Outline()
+                levels = set()
+                balanced = False
+                for heading in self.iter_text_headings(pdf_reader, pdf_path, SeenText(self.seen_limit), pages):
+                    if balanced:
+                        emit((heading,))
+                        continue
+                    buffer.append(*heading)
+                    levels.add(heading[0])
+                    if len(levels) == 3 or len(buffer) >= self.stream_buffer:
+                        self.balance_levels(buffer)
+                        emit(buffer)
+                        buffer = Outline()
+                        balanced = True
+                self.balance_levels(buffer)
+                emit(buffer)
         except Exception as e:
+            # Like extract_document: the document still gets an output file, with an Error title
             print(f"Error processing {pdf_path}: {str(e)}")
-            return {"title": "Error", "outline": []}
+            self.error = str(e)
+            if not titled:
+                sink.write(Outline("Error").title_line())
+        return count
+
+    def start_document(self):
+        """Reset the per-document timings, rule hit counters and triage/error state"""
+        self.timer = StageTimer()
+        self.skipped = None
+        self.error = None
+        reset_rule_hits()
+
+    def process_file(self, filename):
+        """Process a single PDF from the input directory and return its run record"""
+        start_time = time.time()
+        self.start_document()
+        
+        print(f"Processing {filename}...")
+        profiler = DocumentProfiler(self.profile_dir, filename) if self.profile_dir else nullcontext()
+        try:
+            with profiler:
+                output_path, cache_status = self.write_output(filename)
+        except Exception as e:
+            print(f"Error processing {filename}: {str(e)}")
+            record = {"file": filename, "status": "failed", "elapsed": time.time() - start_time, "error": str(e),
+                      "cache": None}
+        else:
+            print(f"Created {output_path}" + (" (cached)" if cache_status == "hit" else ""))
+            # Unreadable PDFs still get an output file, but count as failed in the run summary
+            status = "skipped" if self.skipped else "failed" if self.error else "ok"
+            record = {"file": filename, "status": status,
+                      "elapsed": time.time() - start_time, "error": self.error, "cache": cache_status,
+                      "rules": rule_hits(), "reason": self.skipped}
+        record["timings"] = self.timer.as_dict()
+        return record
+
+    def output_path(self, filename):
+        """Path of the output file written for an input PDF"""
+        extension = '.ndjson' if self.stream or self.output_format == "ndjson" else '.json'
+        return os.path.join(self.output_dir, filename.replace('.pdf', extension))
+
+    def write_output(self, filename):
+        """Extract one input PDF and write its output file; returns (output_path, cache_status).
+
+        Output is written to a temporary file and renamed into place, so readers
+        of the output directory never see a partially written file.
+        """
+        input_path = os.path.join(self.input_dir, filename)
+        output_path = self.output_path(filename)
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        
+        if self.stream:
+            # Streaming output bypasses the result cache
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    self.stream_headings(input_path, f)
+                os.replace(temp_path, output_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            return output_path, None
+        
+        payload = None
+        cache_status = None
+        if self.cache:
+            with self.timer.stage("cache"):
+                cache_key = self.cache.key(input_path)
+                payload = self.cache.get(cache_key)
+            cache_status = "hit" if payload is not None else "miss"
+        
+        chunks = None
+        if payload is None:
+            outline = self.extract_document(input_path)
+            # Serialized straight from the columnar outline; the cache needs the whole payload
+            chunks = outline.iter_json(self.output_format)
+            # Failed extractions are not cached so they are retried next run, nor are
+            # triaged documents, which are cheap to triage again and report their reason
+            if self.cache and outline.title != "Error" and outline.reason is None:
+                with self.timer.stage("write"):
+                    payload = ''.join(chunks)
+                with self.timer.stage("cache"):
+                    self.cache.put(cache_key, payload)
+        
+        # Write the output JSON with proper formatting
+        with self.timer.stage("write"):
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                if payload is not None:
+                    f.write(payload)
+                else:
+                    f.writelines(chunks)
+            os.replace(temp_path, output_path)
+        return output_path, cache_status
+
+    def list_pdfs(self):
+        """List the PDFs in the input directory in a deterministic order"""
+        return sorted(f for f in os.listdir(self.input_dir) if f.lower().endswith('.pdf'))
 
     def process_pdfs(self):
         """Process all PDFs in the input directory"""
-        for filename in os.listdir(self.input_dir):
-            if filename.lower().endswith('.pdf'):
-                input_path = os.path.join(self.input_dir, filename)
-                output_path = os.path.join(self.output_dir, filename.replace('.pdf', '.json'))
-                
-                print(f"Processing {filename}...")
-                result = self.extract_headings(input_path)
-                
-                # Create the output JSON structure exactly matching the sample format
-                output_data = {
-                    "title": result["title"],
-                    "outline": []
-                }
-                
-                # Add each outline item in the required format
-                for item in result["outline"]:
-                    output_data["outline"].append({
-                        "level": item["level"],
-                        "text": item["text"],
-                        "page": item["page"]
-                    })
-                
-                # Write the output JSON with proper formatting
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(output_data, f, indent=2)
-                
-                print(f"Created {output_path}")
+        start_time = time.time()
+        records = self.run_batch(self.list_pdfs())
+        return self.report(records, time.time() - start_time)
+
+    def run_batch(self, filenames):
+        """Process the given input files and return their records in input order"""
+        if self.workers > 1 or self.timeout:
+            # Fan out over a process pool; records come back in input order
+            return BatchProcessor(self, self.workers, self.timeout).run(filenames)
+        return [self.process_file(filename) for filename in filenames]
+
+    def report(self, records, elapsed):
+        """Print the run summary, keep profiles and write metrics; returns the summary"""
+        summary = summarize(records, elapsed)
+        print_summary(summary)
+        
+        if self.profile_dir:
+            slowest = keep_slowest_profiles(self.profile_dir, records, self.profile_top)
+            print(f"Kept profiles for the {len(slowest)} slowest documents in {self.profile_dir}")
+        if self.metrics_file:
+            write_metrics(self.metrics_file, summary, records)
+            print(f"Wrote metrics to {self.metrics_file}")
+        return summary
 
 def main():
     extractor = PDFOutlineExtractor()
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Persistent SQLite cache of rendered outline JSON keyed by content hash.
+
+    Keys combine the PDF's SHA-256, its file name (titles fall back to the
+    file name, so identical bytes under another name may differ) and the
+    extractor version, so a rules change invalidates old entries. The cache
+    is bounded by the total size of stored results and evicts the least
+    recently used entries first.
+    """
+
+    def __init__(self, cache_dir, version, max_bytes=256 * 1024 * 1024):
+        self.path = os.path.join(cache_dir, 'results.sqlite3')
+        self.version = version
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers reconnect lazily
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_pid'] = None
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def key(self, pdf_path):
+        """Cache key for a PDF: content hash, file name and extractor version"""
+        return f"{file_digest(pdf_path)}:{os.path.basename(pdf_path)}:{self.version}"
+
+    def get(self, key):
+        """Return the stored JSON text for key, or None on a miss"""
+        try:
+            row = self.conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            # A broken cache must never fail the extraction; treat it as a miss
+            print(f"Result cache read failed: {str(e)}")
+            return None
+        return row[0]
+
+    def put(self, key, payload):
+        """Store the JSON text for key and evict old entries beyond the size bound"""
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        try:
+            self._put(key, payload, size)
+        except sqlite3.Error as e:
+            print(f"Result cache write failed: {str(e)}")
+
+    def _put(self, key, payload, size):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time()),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                # Evict least recently used entries until the cache fits again
+                for old_key, old_size in conn.execute(
+                        "SELECT key, size FROM results ORDER BY last_used").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                    total -= old_size
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class PageStore:
+    """Page texts from a document's previous extraction, keyed by page fingerprint.
+
+    Stored in the result cache under the document's file name rather than its
+    content hash, so a revised or extended version of the file finds the pages
+    of the earlier one. Texts are matched by fingerprint, not page number, so
+    pages shifted by an insertion are reused as well.
+    """
+
+    def __init__(self, cache, pdf_path):
+        self.cache = cache
+        self.key = f"pages:{os.path.basename(pdf_path)}:{cache.version}"
+        payload = cache.get(self.key)
+        self.previous = json.loads(payload) if payload else {}
+        self.current = {}
+        self.objects = {}  # Digests of fonts and forms shared between pages, see page_fingerprint
+        self.pages = 0
+        self.reused = 0
+
+    def get(self, fingerprint):
+        """Text of an unchanged page from the previous extraction, or None"""
+        text = self.previous.get(fingerprint)
+        if text is not None:
+            self.reused += 1
+        return text
+
+    def add(self, fingerprint, text):
+        self.current[fingerprint] = text
+        self.pages += 1
+
+    def save(self):
+        """Replace the stored pages with the ones seen in this extraction"""
+        self.cache.put(self.key, json.dumps(self.current))
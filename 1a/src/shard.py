@@ -0,0 +1,316 @@
+import os
+import re
+import json
+import time
+import socket
+import hashlib
+from batch import BatchProcessor
+
+# Layout of a run's directory inside the shared shard directory
+CLAIMS_DIR = "claims"        # <file>.claim, created exclusively by the node that owns the file
+MANIFESTS_DIR = "manifests"  # <node>.json, written by each node when its run finishes
+INDEX_FILE = "index.json"    # Global index merged from all manifests
+
+# Seconds after which an unfinished claim that has not been renewed is taken to be
+# left behind by a crashed node and can be taken over
+CLAIM_TTL = 300
+
+
+def shard_of(filename, shard_count):
+    """Stable shard number of an input file name, the same on every node and in every run"""
+    digest = hashlib.blake2b(filename.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shard_count
+
+
+def input_run_id(input_dir, filenames):
+    """Run id derived from the names, sizes and modification times of the input files.
+
+    Nodes looking at the same input directory agree on it without talking to each
+    other, and any added, removed or changed file starts a new run.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for filename in filenames:
+        try:
+            stat = os.stat(os.path.join(input_dir, filename))
+        except OSError:
+            continue  # Removed between listing and stat
+        digest.update(f"{filename}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    return "run-" + digest.hexdigest()
+
+
+def write_json(path, data):
+    """Write a JSON file through a temporary file, so other nodes never read it half-written"""
+    temp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def read_claim(path):
+    """(node id, manifest entry) recorded in a claim file.
+
+    A claim holds the owner's node id, followed by the file's manifest entry
+    once it has been processed; the entry is None until then.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().split('\n')
+    except OSError:
+        return None, None
+    try:
+        entry = json.loads(lines[1]) if len(lines) > 1 and lines[1].strip() else None
+    except ValueError:
+        entry = None
+    return lines[0].strip() or None, entry
+
+
+def merge_manifests(run_dir, filenames):
+    """Combine the per-node manifests of a run into a global index of outputs and failures.
+
+    filenames are the input PDFs; those that appear in no manifest are listed
+    as missing together with the node that claimed them, if any.
+    """
+    documents = {}
+    duplicates = set()
+    nodes = []
+    manifests_dir = os.path.join(run_dir, MANIFESTS_DIR)
+    names = sorted(os.listdir(manifests_dir)) if os.path.isdir(manifests_dir) else []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(manifests_dir, name), encoding='utf-8') as f:
+            manifest = json.load(f)
+        nodes.append({key: manifest[key] for key in ("node", "shard", "shards", "claim", "finished")})
+        nodes[-1]["files"] = len(manifest["documents"])
+        for entry in manifest["documents"]:
+            previous = documents.get(entry["file"])
+            if previous is not None:
+                duplicates.add(entry["file"])
+                # A file handled by two nodes (e.g. after a claim takeover) keeps its successful result
+                if previous["status"] in ("ok", "skipped"):
+                    continue
+            documents[entry["file"]] = dict(entry, node=manifest["node"])
+
+    missing = []
+    for filename in filenames:
+        if filename not in documents:
+            # Done claims carry the entry, in case their node stopped before writing its manifest
+            owner, entry = read_claim(os.path.join(run_dir, CLAIMS_DIR, filename + ".claim"))
+            if entry is not None:
+                documents[filename] = dict(entry, node=owner)
+            else:
+                missing.append({"file": filename, "claimed_by": owner})
+    entries = [documents[filename] for filename in sorted(documents)]
+    return {
+        "files": len(filenames),
+        "ok": sum(1 for e in entries if e["status"] == "ok"),
+        "skipped": sum(1 for e in entries if e["status"] == "skipped"),
+        "failed": sum(1 for e in entries if e["status"] in ("failed", "timeout")),
+        "missing": missing,
+        "duplicates": sorted(duplicates),
+        "failures": [e for e in entries if e["status"] in ("failed", "timeout")],
+        "documents": entries,
+        "nodes": nodes,
+    }
+
+
+class ShardRunner:
+    """Batch run over a slice of an input directory shared by several extractor instances.
+
+    Files are split between instances by a stable hash of their name
+    (shard_index of shard_count), by exclusive claim files, or both. Claims are
+    created with O_CREAT | O_EXCL, so exactly one node wins each file; they are
+    taken one per idle worker, so faster nodes end up with more of the work.
+
+    A claim is a lease: its owner renews it while the file is in flight and
+    afterwards records the file's manifest entry in it, which marks it done.
+    An unfinished claim that has not been renewed for claim_ttl seconds was
+    left by a crashed node and is taken over by the next node that asks for
+    it. A node restarted with the same node_id takes its own claims again
+    straight away.
+
+    Claims, manifests and the index of a run live in shard_dir/<run_id>. The
+    run id defaults to a digest of the input listing, so every node of a run
+    agrees on it and a changed input directory starts a fresh run.
+
+    Each node processes its files with the extractor's local parallelism and
+    then writes a manifest of its records. The node that completes the set of
+    manifests merges them into the global index; merge() can also be run on its
+    own at any time.
+    """
+
+    def __init__(self, extractor, shard_dir, shard_index=None, shard_count=None, claim=False, node_id=None,
+                 run_id=None, claim_ttl=CLAIM_TTL):
+        if shard_count is not None and shard_count < 1:
+            raise ValueError(f"Shard count must be at least 1, got {shard_count}")
+        if shard_count is not None and not (shard_index is not None and 0 <= shard_index < shard_count):
+            raise ValueError(f"Shard index must be between 0 and {shard_count - 1}, got {shard_index}")
+        self.extractor = extractor
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.claim = claim
+        self.claim_ttl = claim_ttl
+        if node_id is None:
+            # Hash shards are fixed, so their id is too; claiming nodes are told apart by host and process
+            node_id = f"shard-{shard_index}-of-{shard_count}" if shard_count and not claim else \
+                f"{socket.gethostname()}-{os.getpid()}"
+        self.node_id = node_id
+        self.run_id = run_id or input_run_id(extractor.input_dir, extractor.list_pdfs())
+        self.run_dir = os.path.join(shard_dir, self.run_id)
+        self.claims_dir = os.path.join(self.run_dir, CLAIMS_DIR)
+        self.manifests_dir = os.path.join(self.run_dir, MANIFESTS_DIR)
+        self.index_path = os.path.join(self.run_dir, INDEX_FILE)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.manifests_dir, re.sub(r'[^\w.-]', '_', self.node_id) + '.json')
+
+    def claim_path(self, filename):
+        return os.path.join(self.claims_dir, filename + ".claim")
+
+    def shard_files(self, filenames):
+        """The input files that belong to this node's hash shard"""
+        if not self.shard_count:
+            return list(filenames)
+        return [f for f in filenames if shard_of(f, self.shard_count) == self.shard_index]
+
+    def is_stale(self, path):
+        try:
+            return time.time() - os.stat(path).st_mtime > self.claim_ttl
+        except OSError:
+            return False
+
+    def claim_file(self, filename):
+        """Try to claim a file for this node; True if it is ours to process"""
+        path = self.claim_path(filename)
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                owner, entry = read_claim(path)
+                if owner == self.node_id:
+                    return True
+                if entry is not None or not self.is_stale(path) or not self.break_claim(path):
+                    return False
+                print(f"Taking over {filename} from {owner}, whose claim expired")
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.node_id + '\n')
+            return True
+
+    def break_claim(self, path):
+        """Remove an expired claim so it can be claimed again; False if another node renewed or took it"""
+        stale_path = f"{path}.{socket.gethostname()}.{os.getpid()}.stale"
+        try:
+            os.rename(path, stale_path)  # Only one of several nodes breaking the same claim succeeds
+        except FileNotFoundError:
+            return True
+        if not self.is_stale(stale_path):
+            # Renewed or re-claimed between the check and the rename: put it back
+            try:
+                os.link(stale_path, path)
+            except OSError:
+                pass
+            os.remove(stale_path)
+            return False
+        os.remove(stale_path)
+        return True
+
+    def renew_claim(self, filename):
+        try:
+            os.utime(self.claim_path(filename))
+        except OSError:
+            pass
+
+    def finish_claim(self, filename, entry):
+        """Record a processed file's manifest entry in its claim, which is then never taken over"""
+        path = self.claim_path(filename)
+        if read_claim(path)[0] == self.node_id:
+            temp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(f"{self.node_id}\n{json.dumps(entry)}\n")
+            os.replace(temp_path, path)
+
+    def process_claimed(self, filenames):
+        """Claim and process files until every candidate is claimed by some node"""
+        extractor = self.extractor
+        records = []
+        candidates = iter(filenames)
+        exhausted = False
+        in_flight = set()
+        processor = BatchProcessor(extractor, max(extractor.workers, 1), extractor.timeout)
+        processor.start()
+        try:
+            while True:
+                # Claim one file per idle worker rather than the whole shard up front
+                while not exhausted and processor.outstanding < len(processor.pool):
+                    filename = next((f for f in candidates if self.claim_file(f)), None)
+                    if filename is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(filename)
+                        processor.submit(filename)
+                if not processor.outstanding:
+                    break
+                # Wake up often enough to renew the leases of the files in flight
+                for filename, record in processor.poll(self.claim_ttl / 3):
+                    in_flight.discard(filename)
+                    self.finish_claim(filename, self.manifest_entry(record))
+                    records.append(record)
+                for filename in in_flight:
+                    self.renew_claim(filename)
+        finally:
+            processor.close()
+        records.sort(key=lambda record: record["file"])
+        return records
+
+    def manifest_entry(self, record):
+        entry = {key: record.get(key) for key in ("file", "status", "elapsed", "error", "reason")}
+        if record["status"] in ("ok", "skipped"):
+            entry["output"] = os.path.basename(self.extractor.output_path(record["file"]))
+        return entry
+
+    def run(self):
+        """Process this node's share of the input directory and write its manifest"""
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        if self.claim:
+            os.makedirs(self.claims_dir, exist_ok=True)
+        start_time = time.time()
+        filenames = self.extractor.list_pdfs()
+        mine = self.shard_files(filenames)
+        mode = f"shard {self.shard_index} of {self.shard_count}" if self.shard_count else "all files"
+        print(f"Node {self.node_id} in {self.run_id}: {mode}, {len(mine)} of {len(filenames)} files"
+              + (", claiming" if self.claim else ""))
+
+        records = self.process_claimed(mine) if self.claim else self.extractor.run_batch(mine)
+        summary = self.extractor.report(records, time.time() - start_time)
+        write_json(self.manifest_path, {
+            "node": self.node_id,
+            "shard": self.shard_index,
+            "shards": self.shard_count,
+            "claim": self.claim,
+            "finished": time.time(),
+            "summary": summary,
+            "documents": [self.manifest_entry(record) for record in records],
+        })
+        print(f"Wrote manifest {self.manifest_path}")
+
+        # Whichever node finishes the last file writes the index; concurrent merges write the same content
+        return self.merge(force=False)
+
+    def merge(self, force=True):
+        """Merge every manifest into the global index; without force, only once no input file is missing"""
+        index = merge_manifests(self.run_dir, self.extractor.list_pdfs())
+        if index["missing"] and not force:
+            print(f"{len(index['missing'])} files are not finished yet; the last node to finish writes the index")
+            return None
+        index["run"] = self.run_id
+        index["merged"] = time.time()
+        os.makedirs(self.run_dir, exist_ok=True)
+        write_json(self.index_path, index)
+        print(f"Wrote index of {index['files']} files to {self.index_path} "
+              f"({index['ok']} ok, {index['skipped']} skipped, {index['failed']} failed, "
+              f"{len(index['missing'])} missing)")
+        for filename in index["duplicates"]:
+            print(f"Warning: {filename} was processed by more than one node")
+        return index
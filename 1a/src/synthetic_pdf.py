@@ -0,0 +1,246 @@
+import random
+import zlib
+
+# Font sizes per heading level; body text is set at BODY_SIZE in a regular face
+LEVEL_SIZES = {"H1": 18, "H2": 14, "H3": 12}
+BODY_SIZE = 10
+TITLE_SIZE = 22
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 50
+
+# Body text is long, lowercase and free of years, colons and numbering so that
+# it never looks like a heading to the text heuristics
+BODY_WORDS = ("the system provides analysis of results and data for every stakeholder "
+              "across regional offices while teams review budget plans with partners "
+              "through careful planning and shared services in each community").split()
+
+TOPICS = ("Digital Library", "Funding Model", "Governance", "Market Analysis", "Risk Review",
+          "Service Design", "Data Platform", "Evaluation", "Timeline", "Partnerships",
+          "Infrastructure", "Training", "Outreach", "Procurement", "Security")
+SCHOOLS = ("Stanford University", "Ontario College of Art", "Lakeside School of Design",
+           "Northern University", "Riverside College")
+PROJECTS = ("Inventory System", "Booking Application", "Analytics Project", "Payment System",
+            "Chat Application")
+RESUME_SECTIONS = ("EDUCATION", "EXPERIENCE", "PROJECTS", "SKILLS", "AWARDS", "PUBLICATIONS")
+RFP_SECTIONS = ("Summary", "Background", "Scope of Work", "Evaluation Criteria", "Milestones",
+                "Appendix")
+
+STYLES = ("resume", "rfp", "report")
+
+# Corporate-style documents: composite fonts with ToUnicode maps of this many
+# entries and a photo of IMAGE_SIZE x IMAGE_SIZE RGB pixels on every page
+TOUNICODE_ENTRIES = 2000
+IMAGE_SIZE = 160
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def body_line(rng):
+    """A run of plain body text that no heading rule should fire on"""
+    words = [rng.choice(BODY_WORDS) for _ in range(rng.randint(16, 22))]
+    return " ".join(words) + "."
+
+
+class SyntheticDocument:
+    """A generated document: its title, page contents and ground-truth outline"""
+
+    def __init__(self, title, style):
+        self.title = title
+        self.style = style
+        self.pages = []     # Per page: list of (font_size, bold, text)
+        self.outline = []   # Ground truth: {"level", "text", "page"} in reading order
+
+    def add_line(self, text, size=BODY_SIZE, bold=False):
+        self.pages[-1].append((size, bold, text))
+
+    def add_heading(self, level, text):
+        self.add_line(text, LEVEL_SIZES[level], True)
+        self.outline.append({"level": level, "text": text, "page": len(self.pages) - 1})
+
+
+def _heading_generator(style, rng):
+    """Yield (level, text) headings in the numbering style of a document type"""
+    if style == "report":
+        for chapter in range(1, 1000):
+            yield "H1", f"{chapter}. {rng.choice(TOPICS)}"
+            for section in range(1, rng.randint(2, 4)):
+                yield "H2", f"{chapter}.{section}. {rng.choice(TOPICS)}"
+                for sub in range(1, rng.randint(1, 3)):
+                    yield "H3", f"{chapter}.{section}.{sub}. {rng.choice(TOPICS)}"
+    elif style == "rfp":
+        for part in range(1, 1000):
+            yield "H1", f"{rng.choice(RFP_SECTIONS)} {part}:"
+            for _ in range(rng.randint(1, 3)):
+                yield "H2", f"{rng.choice(TOPICS)} {part}"
+    else:
+        for index in range(1000):
+            yield "H1", RESUME_SECTIONS[index % len(RESUME_SECTIONS)] + ("" if index < len(RESUME_SECTIONS) else f" {index}")
+            for _ in range(rng.randint(1, 2)):
+                yield "H2", rng.choice(SCHOOLS if index % 2 == 0 else PROJECTS) + f" {index}"
+
+
+def generate_document(style, pages, density, seed=0):
+    """Generate a document of the given style with roughly density headings per line"""
+    rng = random.Random(seed)
+    names = {"resume": "Jordan Rivera", "rfp": "Request for Proposal", "report": "Annual Report"}
+    doc = SyntheticDocument(f"{names[style]} {seed}", style)
+    headings = _heading_generator(style, rng)
+    lines_per_page = (PAGE_HEIGHT - 2 * MARGIN) // (BODY_SIZE + 8)
+    for page_num in range(pages):
+        doc.pages.append([])
+        used = 0
+        if page_num == 0:
+            doc.add_line(doc.title, TITLE_SIZE, True)
+            used += 3
+        while used < lines_per_page:
+            if rng.random() < density:
+                level, text = next(headings)
+                doc.add_heading(level, text)
+                used += 2
+            else:
+                doc.add_line(body_line(rng))
+                used += 1
+    return doc
+
+
+def _stream(data, compress):
+    if compress:
+        data = zlib.compress(data)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data)
+    return b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+
+
+def _composite_font(base_font, add, compress):
+    """A Type0 font with Identity-H encoding and a large ToUnicode CMap, as exported by office suites"""
+    codes = list(range(0x20, 0x20 + TOUNICODE_ENTRIES)) + [0x2019, 0x2022, 0x25CF]
+    cmap = [b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+            b"/CMapName /Synthetic-UCS def /CMapType 2 def",
+            b"1 begincodespacerange <0000> <FFFF> endcodespacerange"]
+    for start in range(0, len(codes), 100):
+        block = codes[start:start + 100]
+        cmap.append(b"%d beginbfchar" % len(block))
+        cmap.extend(b"<%04X> <%04X>" % (code, code) for code in block)
+        cmap.append(b"endbfchar")
+    cmap.append(b"endcmap CMapName currentdict /CMap defineresource pop end end")
+    to_unicode = add(_stream(b"\n".join(cmap), compress))
+    descendant = add(b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s /DW 556 "
+                     b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> >>" % base_font)
+    return (b"<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (base_font, descendant, to_unicode))
+
+
+def write_pdf(doc, path, compress=True, bookmarks=False, corporate=False, forms=False):
+    """Write a SyntheticDocument as a minimal PDF using the standard Helvetica fonts.
+
+    With corporate set, text uses composite fonts with large ToUnicode maps and
+    every page carries a photo, like documents exported from office suites.
+    With forms set, each page only draws its own form XObject, always named /X0,
+    which holds the page's content.
+    """
+    objects = [None, None, None, None]  # catalog, pages, regular font, bold font
+
+    def add(data):
+        objects.append(data)
+        return len(objects)
+
+    if corporate:
+        objects[2] = _composite_font(b"Helvetica", add, compress)
+        objects[3] = _composite_font(b"Helvetica-Bold", add, compress)
+    else:
+        objects[2] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+        objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+
+    rng = random.Random(len(doc.pages))
+    page_ids = []
+    for lines in doc.pages:
+        y = PAGE_HEIGHT - MARGIN
+        ops = []
+        resources = b"/Font << /F1 3 0 R /F2 4 0 R >>"
+        if corporate:
+            # Noise does not compress, so the image stream is as large as a real photo
+            pixels = rng.getrandbits(IMAGE_SIZE * IMAGE_SIZE * 24).to_bytes(IMAGE_SIZE * IMAGE_SIZE * 3, 'big')
+            image_id = add(b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                           b"/BitsPerComponent 8 /Length %d >>\nstream\n%s\nendstream" % (
+                               IMAGE_SIZE, IMAGE_SIZE, len(pixels), pixels))
+            resources += b" /XObject << /Im1 %d 0 R >>" % image_id
+            ops.append(f"q {IMAGE_SIZE} 0 0 {IMAGE_SIZE} {PAGE_WIDTH - MARGIN - IMAGE_SIZE} {MARGIN} cm /Im1 Do Q")
+        for size, bold, text in lines:
+            y -= size + 6
+            if corporate:
+                encoded = "<" + "".join(f"{ord(char):04X}" for char in text) + ">"
+            else:
+                encoded = f"({_escape(text)})"
+            ops.append(f"BT /{'F2' if bold else 'F1'} {size} Tf {MARGIN} {y} Td {encoded} Tj ET")
+        content = "\n".join(ops).encode('cp1252', 'replace')
+        if forms:
+            form = _stream(content, compress)
+            form_id = add(b"<< /Type /XObject /Subtype /Form /BBox [0 0 %d %d] /Resources << %s >> " % (
+                PAGE_WIDTH, PAGE_HEIGHT, resources) + form[2:])
+            resources = b"/XObject << /X0 %d 0 R >>" % form_id
+            content = b"q /X0 Do Q"
+        content_id = add(_stream(content, compress))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << %s >> >>" % (PAGE_WIDTH, PAGE_HEIGHT, content_id, resources)))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+
+    catalog = b"<< /Type /Catalog /Pages 2 0 R"
+    if bookmarks and doc.outline:
+        catalog += b" /Outlines %d 0 R" % _write_outline(doc, page_ids, add, objects)
+    objects[0] = catalog + b" >>"
+    info_id = add(b"<< /Title (%s) /Producer (synthetic_pdf) >>" % _escape(doc.title).encode('cp1252', 'replace'))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, data in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + data + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, info_id, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def _write_outline(doc, page_ids, add, objects):
+    """Write the ground-truth outline as a PDF bookmark tree; returns the root object id"""
+    root_id = add(None)
+    # Build the tree: each node is [entry, children]
+    root = [None, []]
+    stack = [(0, root)]
+    for entry in doc.outline:
+        depth = int(entry["level"][1])
+        while stack[-1][0] >= depth:
+            stack.pop()
+        node = [entry, []]
+        stack[-1][1][1].append(node)
+        stack.append((depth, node))
+
+    def write_children(parent_id, children):
+        ids = [add(None) for _ in children]
+        for index, (node, node_id) in enumerate(zip(children, ids)):
+            entry, grandchildren = node
+            data = b"<< /Title (%s) /Parent %d 0 R /Dest [%d 0 R /Fit]" % (
+                _escape(entry["text"]).encode('cp1252', 'replace'), parent_id, page_ids[entry["page"]])
+            if index > 0:
+                data += b" /Prev %d 0 R" % ids[index - 1]
+            if index + 1 < len(ids):
+                data += b" /Next %d 0 R" % ids[index + 1]
+            if grandchildren:
+                first, last = write_children(node_id, grandchildren)
+                data += b" /First %d 0 R /Last %d 0 R /Count %d" % (first, last, len(grandchildren))
+            objects[node_id - 1] = data + b" >>"
+        return ids[0], ids[-1]
+
+    first, last = write_children(root_id, root[1])
+    objects[root_id - 1] = b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+        first, last, len(root[1]))
+    return root_id
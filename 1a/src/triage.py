@@ -0,0 +1,82 @@
+import re
+
+# Reason codes for documents that are written without being mined for headings
+ENCRYPTED = "encrypted"
+NO_PAGES = "no_pages"
+NO_TEXT = "no_text"
+
+# A text-showing operator (Tj, TJ, ' or ") right after its string or array operand
+TEXT_OPERATOR_RE = re.compile(rb'[)>\]]\s*(?:Tj|TJ|\'|")')
+
+# Nesting depth up to which form XObjects drawn by a page are searched for text
+MAX_FORM_DEPTH = 3
+
+
+def stream_data(obj):
+    """Decoded bytes of a content stream or an array of content streams"""
+    obj = obj.get_object()
+    if isinstance(obj, list):
+        return b"\n".join(stream_data(part) for part in obj)
+    return obj.get_data()
+
+
+def page_resources(obj):
+    """Resource dictionary of a page or form XObject; pages may inherit theirs from the page tree"""
+    while '/Resources' not in obj and '/Parent' in obj:
+        obj = obj['/Parent']
+    resources = obj.get('/Resources')
+    return resources.get_object() if resources is not None else {}
+
+
+def page_xobjects(obj):
+    """XObject dictionary in the resources of a page or form XObject, empty if there is none"""
+    xobjects = page_resources(obj).get('/XObject')
+    return xobjects.get_object() if xobjects is not None else {}
+
+
+def form_xobjects(obj):
+    """Yield the form XObjects (not images) that a page or form XObject can draw"""
+    for xobject in page_xobjects(obj).values():
+        xobject = xobject.get_object()
+        if xobject.get('/Subtype') == '/Form':
+            yield xobject
+
+
+def has_text(obj, depth=0):
+    """True if a page or form XObject has text-showing operators, directly or in its forms"""
+    contents = obj.get('/Contents') if depth == 0 else obj
+    if contents is None:
+        return False
+    data = stream_data(contents)
+    if TEXT_OPERATOR_RE.search(data):
+        return True
+    if depth >= MAX_FORM_DEPTH or b'Do' not in data:
+        return False
+    return any(has_text(form, depth + 1) for form in form_xobjects(obj))
+
+
+def triage(pdf_reader, max_pages=None):
+    """Return a reason code if the document cannot yield any headings, or None.
+
+    Only the trailer, the encryption dictionary, the page tree and the raw
+    content streams are inspected; no text is decoded. Encrypted documents
+    that open with an empty user password are treated as readable.
+    """
+    if pdf_reader.is_encrypted:
+        try:
+            if not pdf_reader.decrypt(""):
+                return ENCRYPTED
+        except Exception:
+            # e.g. AES encryption without a crypto library installed
+            return ENCRYPTED
+    page_count = len(pdf_reader.pages)
+    if page_count == 0:
+        return NO_PAGES
+    for page_num in range(min(page_count, max_pages) if max_pages else page_count):
+        try:
+            if has_text(pdf_reader.pages[page_num]):
+                return None
+        except Exception:
+            # Leave damaged pages to the extractor, which reports them as before
+            return None
+    return NO_TEXT
@@ -0,0 +1,94 @@
+import os
+import signal
+from batch import BatchProcessor
+
+
+class FolderWatcher:
+    """Long-running service that processes PDFs as they appear in the input directory.
+
+    The input directory is polled with os.scandir; a new or changed PDF is only
+    dispatched once its size and modification time are unchanged between two
+    polls, so files still being uploaded are not read half-written. Work goes to
+    a warm BatchProcessor pool whose workers are forked once with the extractor
+    already imported. At most max_pending files are queued or in flight; further
+    files simply wait on disk until the pool catches up.
+    """
+
+    def __init__(self, extractor, poll_interval=1.0, max_pending=None):
+        self.extractor = extractor
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending or 4 * max(extractor.workers, 1)
+        self.processor = BatchProcessor(extractor, max(extractor.workers, 1), extractor.timeout)
+        self.candidates = {}   # filename -> signature seen on the previous poll
+        self.processed = {}    # filename -> signature of the version last processed
+        self.in_flight = {}    # filename -> signature of the version being processed
+        self.running = False
+
+    @staticmethod
+    def signature(entry):
+        stat = entry.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_up_to_date(self, filename, signature):
+        """True if an output newer than the input already exists (e.g. from a previous run)"""
+        try:
+            return os.stat(self.extractor.output_path(filename)).st_mtime_ns >= signature[0]
+        except OSError:
+            return False
+
+    def scan(self):
+        """Return the PDFs that are new or changed and have stopped changing"""
+        ready = []
+        seen = {}
+        with os.scandir(self.extractor.input_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith('.pdf') or not entry.is_file():
+                    continue
+                try:
+                    signature = self.signature(entry)
+                except OSError:
+                    continue  # Removed between listing and stat
+                seen[entry.name] = signature
+                if self.processed.get(entry.name) == signature or entry.name in self.in_flight:
+                    continue
+                if entry.name not in self.processed and self.is_up_to_date(entry.name, signature):
+                    self.processed[entry.name] = signature
+                    continue
+                # Only dispatch once the file looks the same on two consecutive polls
+                if self.candidates.get(entry.name) == signature:
+                    ready.append(entry.name)
+        self.candidates = seen
+        # Forget files that have been removed from the input directory
+        for filename in list(self.processed):
+            if filename not in seen:
+                del self.processed[filename]
+        return sorted(ready)
+
+    def stop(self, *args):
+        """Stop after the files in flight have finished"""
+        self.running = False
+
+    def serve_forever(self):
+        """Watch the input directory until stopped by SIGINT or SIGTERM"""
+        # Workers are forked before the handlers are installed so they keep the default ones
+        self.processor.start()
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        self.running = True
+        print(f"Watching {self.extractor.input_dir} with {len(self.processor.pool)} workers...")
+        try:
+            while self.running or self.in_flight:
+                if self.running:
+                    for filename in self.scan():
+                        # Backpressure: leave the rest on disk until the queue drains
+                        if len(self.in_flight) >= self.max_pending:
+                            break
+                        self.in_flight[filename] = self.candidates[filename]
+                        self.processor.submit(filename)
+                for filename, record in self.processor.poll(self.poll_interval):
+                    signature = self.in_flight.pop(filename)
+                    self.processed[filename] = signature
+                    print(f"{record['status']}: {filename} in {record['elapsed']:.3f}s")
+        finally:
+            self.processor.close()
+        print("Watcher stopped")
@@ -0,0 +1,401 @@
+# Frozen copy of src/pdf_processor.py from the baseline commit, kept as the reference
+# that the default JSON output of the current extractor must match byte for byte.
+import os
+import json
+import time
+from PyPDF2 import PdfReader
+import re
+
+class PDFOutlineExtractor:
+    def __init__(self):
+        self.input_dir = '/app/input'
+        self.output_dir = '/app/output'
+
+    def extract_title(self, pdf_reader, pdf_path):
+        """Extract the title from PDF metadata or filename"""
+        # Special case for file03.pdf - hardcoded title as per requirement
+        filename = os.path.basename(pdf_path)
+        if filename == "file03.pdf":
+            return "RFP:Request for Proposal To Present a Proposal for Developing the Business Plan for the Ontario Digital Library"
+            
+        # Use the filename as the most reliable source for resume titles
+        filename_without_ext = os.path.splitext(filename)[0]
+        
+        # If filename contains the word "resume", it's likely the correct title
+        if "resume" in filename_without_ext.lower():
+            return filename_without_ext
+        
+        # Try to get from metadata if filename doesn't seem appropriate
+        if pdf_reader.metadata and pdf_reader.metadata.title and len(pdf_reader.metadata.title.strip()) > 0:
+            # Verify the metadata title isn't generic
+            if "resume" in pdf_reader.metadata.title.lower() or len(pdf_reader.metadata.title) > 10:
+                return pdf_reader.metadata.title
+            
+        # Next try to get from first page content
+        if len(pdf_reader.pages) > 0:
+            first_page_text = pdf_reader.pages[0].extract_text()
+            if first_page_text:
+                # Get the first non-empty line as title
+                lines = [line.strip() for line in first_page_text.split('\n') if line.strip()]
+                if lines:
+                    # Check if the first line looks like a name (likely the resume owner)
+                    if len(lines[0]) < 50 and not lines[0].endswith(':'):
+                        # Combine with "Resume" if it's just a name
+                        if "resume" not in lines[0].lower():
+                            return f"{lines[0]} Resume"
+                        return lines[0]
+                    
+                    # For RFP documents, try to extract a more complete title
+                    if "RFP" in lines[0] or "Request for Proposal" in lines[0]:
+                        # Try to combine multiple lines for a more complete title
+                        title_parts = []
+                        for line in lines[:3]:  # Look at first 3 lines
+                            if len(line) < 100 and not line.startswith('Date') and not re.match(r'^\d+/\d+/\d+$', line):
+                                title_parts.append(line)
+                            if "Proposal" in line or "Plan" in line:
+                                break
+                        if title_parts:
+                            return " ".join(title_parts)
+        
+        # Default to filename
+        return filename_without_ext
+
+    def is_heading(self, text, prev_text=None, next_text=None):
+        """Determine if text is likely a heading based on various heuristics"""
+        # Skip empty lines
+        if not text.strip():
+            return False
+            
+        # Check if text ends with common heading punctuation
+        if text.strip().endswith((':')): 
+            return True
+            
+        # Check for all caps (common in resume section headings)
+        if text.isupper() and len(text.strip()) < 50:
+            return True
+            
+        # Check for title case with specific conditions for resumes
+        if text.istitle() and len(text.strip()) < 50 and len(text.strip().split()) < 8:
+            return True
+            
+        # Check for short length with year patterns (common in resume entries)
+        if len(text.strip()) < 100 and len(text.strip().split()) < 15:
+            # Check for numeric prefixes like "1.", "1.1", "I.", "A."
+            if re.match(r'^[\d\w][\.\d\s]*\s', text.strip()):
+                return True
+            # Check for year patterns (19XX or 20XX, possibly with ranges)
+            if re.search(r'\b(19|20)\d\d\s*(-|–|to)?\s*(19|20)?\d{0,2}\b', text.strip()):
+                return True
+                
+        # Check for lines that have significant whitespace/tab separation (common in resumes)
+        if '  ' in text and len(text.strip()) < 100:
+            parts = [p for p in re.split(r'\s{2,}', text) if p.strip()]
+            if len(parts) >= 2:
+                return True
+                
+        # Check for common resume section headings
+        common_headings = ['education', 'experience', 'skills', 'projects', 'certificates', 
+                          'certifications', 'awards', 'publications', 'languages', 'interests']
+        if text.lower().strip(':').strip() in common_headings:
+            return True
+                
+        return False
+
+    def determine_heading_level(self, text, page_num):
+        """Determine heading level (H1, H2, H3) based on text characteristics"""
+        text = text.strip()
+        
+        # Special case for file03.pdf - hardcoded heading level
+        if text == "Ontario's Digital Library":
+            return "H1"
+        
+        # Resume-specific patterns
+        
+        # Main section headers in resumes are typically H1
+        if text.isupper() and text.endswith(':') and len(text) < 30:
+            return "H1"
+            
+        # Check for common resume main sections
+        main_sections = ['EDUCATION', 'EXPERIENCE', 'SKILLS', 'PROJECTS', 'CERTIFICATES', 
+                        'CERTIFICATIONS', 'AWARDS', 'PUBLICATIONS']
+        if any(section in text.upper() for section in main_sections):
+            return "H1"
+            
+        # Years and education entries are often H2
+        if re.search(r'\b(19|20)\d{2}\s*(-|–|to)?\s*(19|20)?\d{0,2}\b', text) and len(text) < 30:
+            return "H2"
+            
+        # Names of institutions, companies, or degree programs are often H2
+        if text.istitle() and len(text.split()) <= 5 and not text.startswith('●'):
+            return "H2"
+            
+        # Job titles, projects, or skills with details are often H3
+        if '  ' in text and len(text.strip()) > 30:
+            return "H3"
+            
+        # Bullet points and details are H3
+        if text.startswith('●') or text.startswith('- '):
+            return "H3"
+        
+        # Standard document patterns
+        # Check for numeric patterns indicating hierarchy
+        if re.match(r'^\d+\.\s', text):  # e.g., "1. Introduction"
+            return "H1"
+        elif re.match(r'^\d+\.\d+\.\s', text):  # e.g., "1.1. Overview"
+            return "H2"
+        elif re.match(r'^\d+\.\d+\.\d+\.\s', text):  # e.g., "1.1.1. Details"
+            return "H3"
+            
+        # Check for Roman numerals
+        if re.match(r'^[IVX]+\.\s', text):
+            return "H1"
+            
+        # Check for alphabetic markers
+        if re.match(r'^[A-Z]\.\s', text):
+            return "H2"
+            
+        # First page (page 0) headings with specific characteristics
+        if page_num == 0:
+            if text.isupper() and len(text) < 50:  # All caps headers on first page
+                return "H1"
+            elif len(text) < 30:  # Short text on first page
+                return "H2"
+            
+        # Default to H2 for most detected headings
+        return "H2"
+
+    def extract_headings(self, pdf_path):
+        """Extract headings from PDF"""
+        start_time = time.time()
+        
+        try:
+            with open(pdf_path, 'rb') as file:
+                pdf_reader = PdfReader(file)
+                title = self.extract_title(pdf_reader, pdf_path)
+                
+                headings = []
+                seen_text = set()  # To avoid duplicate headings
+                main_sections = []
+                current_section = None
+                
+                # Special case for file03.pdf - add hardcoded H1 heading
+                filename = os.path.basename(pdf_path)
+                if filename == "file03.pdf":
+                    # Add the specific H1 heading required for file03.pdf
+                    headings.append({
+                        "level": "H1",
+                        "text": "Ontario\u2019s Digital Library",
+                        "page": 1
+                    })
+                    seen_text.add("Ontario\u2019s Digital Library")
+                
+                # Process each page (zero-indexed)
+                for page_num, page in enumerate(pdf_reader.pages):
+                    text = page.extract_text()
+                    if not text:
+                        continue
+                        
+                    lines = text.split('\n')
+                    
+                    # First pass: identify main sections (H1 headings)
+                    for line in lines:
+                        line_clean = line.strip()
+                        if not line_clean:
+                            continue
+                            
+                        # Check for main section headings (all caps, ending with colon)
+                        if (line_clean.isupper() and len(line_clean) < 30) or \
+                           (line_clean.endswith(':') and line_clean[:-1].strip().isupper()):
+                            main_sections.append(line_clean)
+                            current_section = line_clean
+                            # Add main section as H1 heading
+                            if line_clean not in seen_text:
+                                headings.append({
+                                    "level": "H1",
+                                    "text": line_clean,
+                                    "page": page_num
+                                })
+                                seen_text.add(line_clean)
+                    
+                    # Second pass: extract institution names and project details
+                    for i, line in enumerate(lines):
+                        if i >= len(lines) - 1:
+                            continue
+                            
+                        current_line = line.strip()
+                        next_line = lines[i+1].strip() if i < len(lines)-1 else ""
+                        
+                        # Skip empty lines or already processed text
+                        if not current_line or len(current_line) < 2 or current_line in seen_text:
+                            continue
+                            
+                        # Education section: Look for institution names
+                        if current_section and "EDUCATION" in current_section:
+                            # If current line contains a year pattern and next line looks like an institution
+                            if re.search(r'\b(19|20)\d{2}\b', current_line) and len(next_line) > 10 and next_line not in seen_text:
+                                # Extract the institution name
+                                if "University" in next_line or "College" in next_line or "School" in next_line:
+                                    headings.append({
+                                        "level": "H2",
+                                        "text": next_line,
+                                        "page": page_num
+                                    })
+                                    seen_text.add(next_line)
+                        
+                        # Project section: Extract project names and details
+                        if current_section and any(section in current_section for section in ["PROJECTS", "PROJECT", "EXPERIENCE"]):
+                            # Look for project titles (typically short phrases with keywords)
+                            if ("Project" in current_line or "System" in current_line or "Application" in current_line) \
+                               and len(current_line) < 60 and current_line not in seen_text:
+                                headings.append({
+                                    "level": "H2",
+                                    "text": current_line,
+                                    "page": page_num
+                                })
+                                seen_text.add(current_line)
+                            # Capture bullet points as project details
+                            elif current_line.startswith('●') and current_line not in seen_text:
+                                headings.append({
+                                    "level": "H3",
+                                    "text": current_line,
+                                    "page": page_num
+                                })
+                                seen_text.add(current_line)
+                    
+                    # Process each line for general headings
+                    for i, line in enumerate(lines):
+                        # Skip if line is too short or empty
+                        if len(line.strip()) < 2:
+                            continue
+                            
+                        # Get context (previous and next lines)
+                        prev_line = lines[i-1] if i > 0 else ""
+                        next_line = lines[i+1] if i < len(lines)-1 else ""
+                        
+                        # Check if this line is a heading
+                        if self.is_heading(line, prev_line, next_line):
+                            # Skip duplicate headings
+                            clean_text = line.strip()
+                            if clean_text in seen_text:
+                                continue
+                            
+                            # Skip lines that are likely not resume headings
+                            if len(clean_text) > 100 or ("●" in clean_text and not clean_text.startswith("●")):
+                                continue
+                                
+                            seen_text.add(clean_text)
+                            level = self.determine_heading_level(clean_text, page_num)
+                            
+                            # Special handling for education section
+                            if current_section and "EDUCATION" in current_section:
+                                if i < len(lines) - 1:
+                                    next_line_clean = next_line.strip()
+                                    if re.search(r'\b(19|20)\d{2}\b', clean_text) and len(next_line_clean) > 10 and next_line_clean not in seen_text:
+                                        headings.append({
+                                            "level": "H2",
+                                            "text": next_line_clean,
+                                            "page": page_num
+                                        })
+                                        seen_text.add(next_line_clean)
+                            
+                            # Special handling for projects/experience sections
+                            if current_section and any(section in current_section for section in ["PROJECTS", "PROJECT", "EXPERIENCE"]):
+                                if i < len(lines) - 1:
+                                    next_line_clean = next_line.strip()
+                                    if re.search(r'\b(19|20)\d{2}\b', next_line_clean) and next_line_clean not in seen_text:
+                                        clean_text = f"{clean_text} - {next_line_clean}"
+                                        level = "H2"
+                                        seen_text.add(next_line_clean)
+                                    elif clean_text.startswith('●'):
+                                        level = "H3"
+                            
+                            headings.append({
+                                "level": level,
+                                "text": clean_text,
+                                "page": page_num
+                            })
+                
+                # Ensure we have at least one heading of each level
+                has_h1 = any(h["level"] == "H1" for h in headings)
+                has_h2 = any(h["level"] == "H2" for h in headings)
+                has_h3 = any(h["level"] == "H3" for h in headings)
+                
+                # If no H1, promote the first heading to H1
+                if not has_h1 and headings:
+                    headings[0]["level"] = "H1"
+                
+                # If no H2, convert some H3s to H2 or create a default H2
+                if not has_h2 and has_h3:
+                    # Find the first H3 and make it H2
+                    for h in headings:
+                        if h["level"] == "H3":
+                            h["level"] = "H2"
+                            break
+                elif not has_h2 and headings:
+                    # Add a default H2
+                    h1_index = next((i for i, h in enumerate(headings) if h["level"] == "H1"), -1)
+                    if h1_index >= 0 and h1_index + 1 < len(headings):
+                        headings[h1_index + 1]["level"] = "H2"
+                
+                # If no H3, convert some H2s to H3 or create a default H3
+                if not has_h3 and has_h2:
+                    # Find a later H2 and make it H3
+                    h2_indices = [i for i, h in enumerate(headings) if h["level"] == "H2"]
+                    if len(h2_indices) > 1:
+                        headings[h2_indices[1]]["level"] = "H3"
+                
+                # Format the result according to the sample format
+                result = {
+                    "title": title,
+                    "outline": []
+                }
+                
+                for heading in headings:
+                    result["outline"].append({
+                        "level": heading["level"],
+                        "text": heading["text"],
+                        "page": heading["page"]
+                    })
+                
+                return result
+                
+        except Exception as e:
+            print(f"Error processing {pdf_path}: {str(e)}")
+            return {"title": "Error", "outline": []}
+
+    def process_pdfs(self):
+        """Process all PDFs in the input directory"""
+        for filename in os.listdir(self.input_dir):
+            if filename.lower().endswith('.pdf'):
+                input_path = os.path.join(self.input_dir, filename)
+                output_path = os.path.join(self.output_dir, filename.replace('.pdf', '.json'))
+                
+                print(f"Processing {filename}...")
+                result = self.extract_headings(input_path)
+                
+                # Create the output JSON structure exactly matching the sample format
+                output_data = {
+                    "title": result["title"],
+                    "outline": []
+                }
+                
+                # Add each outline item in the required format
+                for item in result["outline"]:
+                    output_data["outline"].append({
+                        "level": item["level"],
+                        "text": item["text"],
+                        "page": item["page"]
+                    })
+                
+                # Write the output JSON with proper formatting
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(output_data, f, indent=2)
+                
+                print(f"Created {output_path}")
+
+def main():
+    extractor = PDFOutlineExtractor()
+    extractor.process_pdfs()
+
+if __name__ == "__main__":
+    main()
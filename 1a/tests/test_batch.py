@@ -0,0 +1,52 @@
+import os
+import time
+from batch import BatchProcessor, percentile
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 50) == 0.0
+    assert percentile([1, 2, 3, 4, 5, 6], 50) == 3
+    assert percentile([1, 2], 50) == 1
+    assert percentile([5, 1, 3], 50) == 3
+    values = list(range(1, 21))
+    assert percentile(values, 95) == 19
+    assert percentile(values, 96) == 20
+    assert percentile(values, 100) == 20
+    assert percentile(values, 0) == 1
+
+
+class StubExtractor:
+    """Stands in for PDFOutlineExtractor in the worker processes"""
+
+    def process_file(self, filename):
+        if filename == "hang.pdf":
+            time.sleep(60)
+        if filename == "crash.pdf":
+            os._exit(3)
+        return {"file": filename, "status": "ok", "elapsed": 0.0}
+
+
+def test_hanging_and_crashing_files_fail_alone():
+    filenames = ["a.pdf", "hang.pdf", "crash.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    start = time.time()
+    records = BatchProcessor(StubExtractor(), workers=2, timeout=1).run(filenames)
+    assert time.time() - start < 10
+    assert [record["file"] for record in records] == filenames
+    assert [record["status"] for record in records] == ["ok", "timeout", "failed", "ok", "ok", "ok"]
+    assert records[1]["error"] == "timed out after 1 seconds"
+    assert records[2]["error"] == "worker exited with code 3"
+
+
+def test_warm_pool_keeps_going_after_a_crash():
+    processor = BatchProcessor(StubExtractor(), workers=1)
+    processor.start()
+    try:
+        for filename in ("crash.pdf", "a.pdf"):
+            processor.submit(filename)
+        records = {}
+        while processor.outstanding:
+            records.update(processor.poll(5))
+    finally:
+        processor.close()
+    assert records["crash.pdf"]["status"] == "failed"
+    assert records["a.pdf"]["status"] == "ok"
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from http_api import ExtractionServer, HTTPError, parse_multipart
+
+
+def multipart(*parts, boundary="XyZ"):
+    body = b""
+    for disposition, content in parts:
+        body += (f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+                 f"Content-Type: application/pdf\r\n\r\n").encode('latin-1') + content + b"\r\n"
+    return body + f"--{boundary}--\r\n".encode('latin-1')
+
+
+def test_parse_multipart_names_and_contents():
+    body = multipart(('form-data; name="file"; filename="a.pdf"', b"%PDF-a\r\nline"),
+                     ('form-data; name="file"', b"%PDF-b"))
+    parts = parse_multipart(body, 'multipart/form-data; boundary="XyZ"')
+    assert parts == [("a.pdf", b"%PDF-a\r\nline"), ("upload2.pdf", b"%PDF-b")]
+
+
+def test_parse_multipart_without_parts_or_boundary():
+    assert parse_multipart(b"--XyZ--\r\n", "multipart/form-data; boundary=XyZ") == []
+    with pytest.raises(HTTPError) as error:
+        parse_multipart(multipart(("form-data", b"x")), "multipart/form-data")
+    assert error.value.status == 400
+
+
+def read_body(data, headers, max_body=100):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await ExtractionServer(None, max_body=max_body).read_body(reader, headers)
+    return asyncio.run(read())
+
+
+def test_read_body_by_length_and_chunks():
+    assert read_body(b"hello world", {"content-length": "5"}) == b"hello"
+    chunked = b"5;ext=1\r\nhello\r\n6\r\n world\r\n0\r\nTrailer: x\r\n\r\n"
+    assert read_body(chunked, {"transfer-encoding": "chunked"}) == b"hello world"
+
+
+@pytest.mark.parametrize("headers,data,status", [
+    ({}, b"hello", 411),
+    ({"content-length": "-1"}, b"hello", 400),
+    ({"content-length": "five"}, b"hello", 400),
+    ({"content-length": "+5"}, b"hello", 400),
+    ({"content-length": "101"}, b"hello", 413),
+    ({"transfer-encoding": "chunked"}, b"zz\r\nhello\r\n0\r\n\r\n", 400),
+    ({"transfer-encoding": "chunked"}, b"-5\r\nhello\r\n0\r\n\r\n", 400),
+    ({"transfer-encoding": "chunked"}, b"65\r\n" + b"x" * 101 + b"\r\n0\r\n\r\n", 413),
+])
+def test_read_body_rejects_bad_requests(headers, data, status):
+    with pytest.raises(HTTPError) as error:
+        read_body(data, headers)
+    assert error.value.status == status
+
+
+class BrokenPool(Executor):
+    """Executor whose every task fails as if a worker process had died"""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, **kwargs):
+        self.shut_down = True
+
+
+def test_broken_pool_is_replaced_once():
+    server = ExtractionServer(None, max_concurrency=4)
+    broken = server.pool = BrokenPool()
+    replacements = []
+
+    def new_pool():
+        replacements.append(BrokenPool())
+        return replacements[-1]
+    server._new_pool = new_pool
+
+    async def requests():
+        server.slots = asyncio.Semaphore(server.max_concurrency)
+        return await asyncio.gather(*(server.extract(b"", f"{n}.pdf") for n in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(requests())
+    assert all(isinstance(error, HTTPError) and error.status == 500 for error in errors)
+    assert broken.shut_down
+    assert len(replacements) == 1 and not replacements[0].shut_down
+    assert server.pool is replacements[0]
@@ -0,0 +1,46 @@
+from synthetic_pdf import SyntheticDocument, generate_document, write_pdf
+from pdf_processor import PDFOutlineExtractor
+
+
+def headings_document(*headings):
+    """One page per heading, each followed by a little body text"""
+    doc = SyntheticDocument("Living Document Title", "report")
+    for text in headings:
+        doc.pages.append([])
+        doc.add_heading("H1", text)
+        doc.add_line("the system provides analysis of results and data for every stakeholder")
+    return doc
+
+
+def extract_both(tmp_path, doc, forms):
+    """Output of an incremental run (reusing the cache of earlier calls) and of a full run"""
+    write_pdf(doc, str(tmp_path / "living.pdf"), forms=forms)
+    outputs = []
+    for incremental in (True, False):
+        out_dir = tmp_path / ("inc" if incremental else "full")
+        out_dir.mkdir(exist_ok=True)
+        cache_dir = str(tmp_path / "cache") if incremental else None
+        extractor = PDFOutlineExtractor(str(tmp_path), str(out_dir), cache_dir=cache_dir, incremental=incremental)
+        extractor.process_file("living.pdf")
+        outputs.append((out_dir / "living.json").read_text())
+    return outputs
+
+
+def test_pages_drawn_through_form_xobjects_are_not_confused(tmp_path, capsys):
+    # Every page draws "q /X0 Do Q", so only the form XObject tells the pages apart
+    extract_both(tmp_path, headings_document("INTRODUCTION", "BACKGROUND", "RESULTS"), forms=True)
+    incremental, full = extract_both(
+        tmp_path, headings_document("INTRODUCTION", "METHODS", "CONCLUSIONS", "APPENDIX"), forms=True)
+    assert incremental == full
+    assert "METHODS" in incremental and "APPENDIX" in incremental
+    assert "Reused 1 of 4 pages" in capsys.readouterr().out
+
+
+def test_unchanged_pages_are_reused(tmp_path, capsys):
+    doc = generate_document("report", 6, 0.2, seed=4)
+    extract_both(tmp_path, doc, forms=False)
+    size, bold, _ = doc.pages[3][2]
+    doc.pages[3][2] = (size, bold, "REVISED SECTION: Budget")
+    incremental, full = extract_both(tmp_path, doc, forms=False)
+    assert incremental == full
+    assert "Reused 5 of 6 pages" in capsys.readouterr().out
@@ -0,0 +1,35 @@
+from synthetic_pdf import STYLES, SyntheticDocument, generate_document, write_pdf
+from pdf_processor import PDFOutlineExtractor
+
+BODY_TEXT = "the system provides analysis of results and data for every stakeholder in the region"
+
+
+def test_layout_levels_match_ground_truth(tmp_path):
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path), engine="layout")
+    for style in STYLES:
+        doc = generate_document(style, 3, 0.2, seed=5)
+        path = tmp_path / f"{style}.pdf"
+        write_pdf(doc, str(path))
+        outline = extractor.extract_headings(str(path))["outline"]
+        # The cover title is neither an entry nor the H1 size
+        assert doc.title not in [entry["text"] for entry in outline]
+        expected = {entry["text"]: entry["level"] for entry in doc.outline}
+        assert [entry["level"] for entry in outline] == [expected[entry["text"]] for entry in outline]
+        assert len(outline) == len(expected)
+
+
+def test_page_0_headings_are_kept_without_a_cover_title(tmp_path):
+    # Page 0 opens with an H1 in the largest size on the page, as in documents without a cover
+    doc = SyntheticDocument("Untitled", "report")
+    for page in range(2):
+        doc.pages.append([])
+        doc.add_heading("H1", f"{page + 1}. Chapter")
+        doc.add_line(BODY_TEXT)
+        doc.add_heading("H2", f"{page + 1}.1. Section")
+        doc.add_line(BODY_TEXT)
+        doc.add_line(BODY_TEXT)
+    path = tmp_path / "untitled.pdf"
+    write_pdf(doc, str(path))
+    outline = PDFOutlineExtractor(str(tmp_path), str(tmp_path), engine="layout").extract_headings(str(path))["outline"]
+    assert [(e["level"], e["text"], e["page"]) for e in outline] == \
+        [(e["level"], e["text"], e["page"]) for e in doc.outline]
@@ -0,0 +1,86 @@
+import json
+import pytest
+from synthetic_pdf import STYLES, generate_document, write_pdf
+from pdf_processor import PDFOutlineExtractor
+from outline import Outline
+from baseline_pdf_processor import PDFOutlineExtractor as BaselineExtractor
+
+# Generated documents: every style, plain and composite fonts, compressed and raw streams
+DOCUMENTS = [(style, seed, corporate) for style in STYLES for seed in (1, 2) for corporate in (False, True)]
+
+
+def make_pdf(directory, style, seed, corporate):
+    filename = f"{style}_{seed}{'_corporate' if corporate else ''}.pdf"
+    write_pdf(generate_document(style, 4, 0.2, seed), str(directory / filename),
+              compress=seed % 2 == 0, corporate=corporate)
+    return filename
+
+
+def baseline_json(path):
+    return json.dumps(BaselineExtractor().extract_headings(str(path)), indent=2)
+
+
+@pytest.mark.parametrize("style,seed,corporate", DOCUMENTS)
+def test_json_output_matches_baseline(tmp_path, style, seed, corporate):
+    filename = make_pdf(tmp_path, style, seed, corporate)
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path))
+    record = extractor.process_file(filename)
+    assert record["status"] == "ok"
+    with open(extractor.output_path(filename), encoding='utf-8') as f:
+        assert f.read() == baseline_json(tmp_path / filename)
+
+
+def test_cached_output_matches_baseline(tmp_path):
+    filename = make_pdf(tmp_path, "report", 3, False)
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path), cache_dir=str(tmp_path / "cache"))
+    assert extractor.process_file(filename)["cache"] == "miss"
+    assert extractor.process_file(filename)["cache"] == "hit"
+    with open(extractor.output_path(filename), encoding='utf-8') as f:
+        assert f.read() == baseline_json(tmp_path / filename)
+
+
+@pytest.mark.parametrize("reason", [None, "no_text"])
+def test_outline_dumps_matches_json_module(reason):
+    outline = Outline("Café \"Report\"", reason)
+    outline.append("H1", "1. Introduction – über", 1)
+    outline.append("H2", "Tab\tand \\ backslash", 2)
+    assert outline.dumps() == json.dumps(outline.to_dict(), indent=2)
+    assert Outline("Empty").dumps() == json.dumps({"title": "Empty", "outline": []}, indent=2)
+    for line in outline.dumps("ndjson").splitlines()[1:]:
+        assert json.loads(line) in outline.to_list()
+
+
+@pytest.mark.parametrize("style", STYLES)
+def test_parallel_pages_match_sequential(tmp_path, style):
+    path = str(tmp_path / f"{style}.pdf")
+    write_pdf(generate_document(style, 12, 0.2, seed=5), path)
+    sequential = PDFOutlineExtractor(str(tmp_path), str(tmp_path)).extract_headings(path)
+    parallel = PDFOutlineExtractor(str(tmp_path), str(tmp_path), page_workers=2,
+                                   page_parallel_min_pages=4).extract_headings(path)
+    assert parallel == sequential
+    assert len(sequential["outline"]) > 5
+
+
+@pytest.mark.parametrize("page_workers", (1, 2))
+def test_page_limit_is_reported_once(tmp_path, capsys, page_workers):
+    path = str(tmp_path / "report.pdf")
+    write_pdf(generate_document("report", 8, 0.2, seed=5), path)
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path), max_pages=6, page_workers=page_workers,
+                                    page_parallel_min_pages=4)
+    headings = extractor.extract_headings(path)
+    assert max(entry["page"] for entry in headings["outline"]) <= 5
+    assert capsys.readouterr().out.count("Stopping after 6 pages (page limit)") == 1
+
+
+@pytest.mark.parametrize("options", ({}, {"stream": True}, {"output_format": "ndjson"}))
+def test_unreadable_pdf_gets_an_error_output(tmp_path, options):
+    (tmp_path / "bad.pdf").write_bytes(b"%PDF-1.4 garbage")
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path), **options)
+    record = extractor.process_file("bad.pdf")
+    assert record["status"] == "failed" and record["error"]
+    with open(extractor.output_path("bad.pdf"), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    if extractor.output_path("bad.pdf").endswith(".ndjson"):
+        assert [json.loads(line) for line in lines] == [{"title": "Error"}]
+    else:
+        assert json.loads('\n'.join(lines)) == {"title": "Error", "outline": []}
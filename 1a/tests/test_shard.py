@@ -0,0 +1,69 @@
+import os
+import time
+from synthetic_pdf import generate_document, write_pdf
+from pdf_processor import PDFOutlineExtractor
+from shard import ShardRunner, read_claim
+
+
+def make_runner(tmp_path, node_id, claim_ttl=300):
+    extractor = PDFOutlineExtractor(str(tmp_path / "in"), str(tmp_path / "out"))
+    return ShardRunner(extractor, str(tmp_path / "out" / "_shards"), claim=True, node_id=node_id,
+                       claim_ttl=claim_ttl)
+
+
+def write_inputs(tmp_path, count):
+    (tmp_path / "in").mkdir(exist_ok=True)
+    (tmp_path / "out").mkdir(exist_ok=True)
+    for i in range(count):
+        write_pdf(generate_document("report", 2, 0.2, seed=i), str(tmp_path / "in" / f"doc{i}.pdf"))
+
+
+def test_claims_are_exclusive_until_they_expire(tmp_path):
+    write_inputs(tmp_path, 1)
+    crashed = make_runner(tmp_path, "crashed", claim_ttl=1)
+    os.makedirs(crashed.claims_dir)
+    assert crashed.claim_file("doc0.pdf")
+    other = make_runner(tmp_path, "other", claim_ttl=1)
+    assert not other.claim_file("doc0.pdf")
+    # Its owner gets it back straight away
+    assert crashed.claim_file("doc0.pdf")
+
+    stale = time.time() - 5
+    os.utime(crashed.claim_path("doc0.pdf"), (stale, stale))
+    assert other.claim_file("doc0.pdf")
+    assert read_claim(other.claim_path("doc0.pdf")) == ("other", None)
+    assert not crashed.claim_file("doc0.pdf")
+
+
+def test_done_claims_are_never_taken_over(tmp_path):
+    write_inputs(tmp_path, 2)
+    index = make_runner(tmp_path, "node0").run()
+    assert index["ok"] == 2 and not index["missing"]
+
+    rerun = make_runner(tmp_path, "node1", claim_ttl=0)
+    stale = time.time() - 5
+    os.utime(rerun.claim_path("doc0.pdf"), (stale, stale))
+    assert not rerun.claim_file("doc0.pdf")
+
+
+def test_index_recovers_files_from_done_claims(tmp_path):
+    write_inputs(tmp_path, 2)
+    runner = make_runner(tmp_path, "node0")
+    runner.run()
+    # A node that dies after finishing its files but before writing its manifest
+    os.remove(runner.manifest_path)
+    index = runner.merge()
+    assert [entry["file"] for entry in index["documents"]] == ["doc0.pdf", "doc1.pdf"]
+    assert all(entry["node"] == "node0" for entry in index["documents"])
+    assert not index["missing"]
+
+
+def test_changed_inputs_start_a_new_run(tmp_path):
+    write_inputs(tmp_path, 2)
+    first = make_runner(tmp_path, "node0")
+    first.run()
+    write_pdf(generate_document("report", 3, 0.2, seed=9), str(tmp_path / "in" / "doc1.pdf"))
+    second = make_runner(tmp_path, "node0")
+    assert second.run_id != first.run_id
+    index = second.run()
+    assert index["ok"] == 2 and os.path.exists(second.index_path)
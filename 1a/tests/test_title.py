@@ -0,0 +1,28 @@
+import pytest
+from synthetic_pdf import SyntheticDocument, TITLE_SIZE, generate_document, write_pdf
+from pdf_processor import PDFOutlineExtractor
+
+
+@pytest.mark.parametrize("forms", [False, True])
+@pytest.mark.parametrize("style", ["rfp", "report"])
+def test_early_title_matches_full_decode(tmp_path, style, forms):
+    path = str(tmp_path / f"{style}.pdf")
+    write_pdf(generate_document(style, 2, 0.2, seed=7), path, forms=forms)
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path))
+    with extractor.open_reader(path) as reader:
+        full = reader.pages[0].extract_text()
+        early = extractor.first_page_text(reader)
+        assert full.startswith(early)
+        assert extractor.page_title(reader, path) == extractor.page_title(reader, path, full)
+
+
+def test_cover_drawn_through_form_is_not_doubled(tmp_path):
+    # The visitor sees the form's runs and then its whole text again
+    doc = SyntheticDocument("Quarterly Report", "report")
+    doc.pages.append([])
+    doc.add_line(doc.title, TITLE_SIZE, True)
+    path = str(tmp_path / "cover.pdf")
+    write_pdf(doc, path, forms=True)
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path))
+    with extractor.open_reader(path) as reader:
+        assert extractor.page_title(reader, path) == "Quarterly Report Resume"
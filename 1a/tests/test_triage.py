@@ -0,0 +1,61 @@
+import json
+from synthetic_pdf import SyntheticDocument, generate_document, write_pdf
+from pdf_processor import PDFOutlineExtractor
+
+
+def blank_document(pages, bookmarks):
+    """A document whose pages draw no text, like a scan, with optional bookmark entries"""
+    doc = SyntheticDocument("Scanned Book", "report")
+    doc.pages = [[] for _ in range(pages)]
+    doc.outline = [{"level": "H1", "text": f"Chapter {n + 1}", "page": n} for n in range(bookmarks)]
+    return doc
+
+
+def run(tmp_path, filename, **options):
+    extractor = PDFOutlineExtractor(str(tmp_path), str(tmp_path), **options)
+    record = extractor.process_file(filename)
+    with open(extractor.output_path(filename), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    return record, (lines if options.get("stream") else json.loads('\n'.join(lines)))
+
+
+def test_scanned_document_is_skipped(tmp_path):
+    write_pdf(blank_document(5, 0), str(tmp_path / "scan.pdf"), bookmarks=True)
+    record, result = run(tmp_path, "scan.pdf")
+    assert record["status"] == "skipped" and record["reason"] == "no_text"
+    assert result == {"title": "Scanned Book", "outline": [], "reason": "no_text"}
+
+
+def test_scanned_document_keeps_its_bookmarks(tmp_path):
+    write_pdf(blank_document(5, 4), str(tmp_path / "scan.pdf"), bookmarks=True)
+    record, result = run(tmp_path, "scan.pdf")
+    assert record["status"] == "ok" and record["reason"] is None
+    assert len(result["outline"]) == 4 and "reason" not in result
+    assert result == run(tmp_path, "scan.pdf", use_triage=False)[1]
+    _, lines = run(tmp_path, "scan.pdf", stream=True)
+    assert [json.loads(line) for line in lines[1:]] == result["outline"]
+
+
+def test_text_documents_are_not_triaged(tmp_path):
+    write_pdf(generate_document("report", 3, 0.2, seed=2), str(tmp_path / "report.pdf"))
+    record, result = run(tmp_path, "report.pdf")
+    assert record["status"] == "ok" and "reason" not in result
+    assert result == run(tmp_path, "report.pdf", use_triage=False)[1]
+
+
+def test_cache_keeps_triage_settings_apart(tmp_path):
+    write_pdf(blank_document(5, 0), str(tmp_path / "scan.pdf"), bookmarks=True)
+    cache_dir = str(tmp_path / "cache")
+    record, result = run(tmp_path, "scan.pdf", cache_dir=cache_dir, use_triage=False)
+    assert record["status"] == "ok" and "reason" not in result
+    record, result = run(tmp_path, "scan.pdf", cache_dir=cache_dir)
+    assert record["status"] == "skipped" and result["reason"] == "no_text"
+
+
+def test_cache_keeps_bookmark_thresholds_apart(tmp_path):
+    write_pdf(blank_document(5, 2), str(tmp_path / "scan.pdf"), bookmarks=True)
+    cache_dir = str(tmp_path / "cache")
+    _, result = run(tmp_path, "scan.pdf", cache_dir=cache_dir, use_triage=False, min_outline_entries=2)
+    assert len(result["outline"]) == 2
+    _, result = run(tmp_path, "scan.pdf", cache_dir=cache_dir, use_triage=False)
+    assert result["outline"] == []